@@ -24,7 +24,19 @@ application.add_middleware(GZipMiddleware)
 
 
 settings = Settings()
-mongodb_storage = MongoDBStorage(settings.DATABASE_URL, db=settings.DATABASE_NAME)
+mongodb_storage = MongoDBStorage(
+    settings.DATABASE_URL,
+    db=settings.DATABASE_NAME,
+    max_pool_size=settings.DATABASE_MAX_POOL_SIZE,
+    min_pool_size=settings.DATABASE_MIN_POOL_SIZE,
+    max_idle_time=settings.DATABASE_MAX_IDLE_TIME,
+    connect_timeout=settings.DATABASE_CONNECT_TIMEOUT,
+    server_selection_timeout=settings.DATABASE_SERVER_SELECTION_TIMEOUT,
+    socket_timeout=settings.DATABASE_SOCKET_TIMEOUT,
+    compressors=settings.DATABASE_COMPRESSORS,
+    read_preference=settings.DATABASE_READ_PREFERENCE,
+    drain_timeout=settings.DATABASE_DRAIN_TIMEOUT,
+)
 
 
 @application.on_event("startup")
@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+import orjson
+from fastapi import status
+from starlette.responses import Response
+
+__all__ = ("build_validators", "get_not_modified_response")
+
+
+def build_validators(version: tuple[int, datetime | None], *request: Any) -> dict[str, str]:
+    """
+    Build validators of a response, without building the response itself.
+
+    Args:
+        version: Number of entities and the last update, see `get_version` of interactors.
+        *request: Everything else, the response depends on, e.g. query parameters.
+
+    Returns: ETag, Last-Modified and Vary headers.
+
+    """
+    count, updated = version
+    payload = orjson.dumps([count, updated, *request], default=str)
+
+    headers = {"ETag": f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"', "Vary": "Accept"}
+
+    if updated is not None:
+        headers["Last-Modified"] = format_datetime(updated, usegmt=True)
+
+    return headers
+
+
+def get_not_modified_response(
+    headers: dict[str, str], *, if_none_match: str | None, if_modified_since: str | None
+) -> Response | None:
+    """
+    Check, whether the client already has the response.
+
+    Args:
+        headers: Validators from `build_validators`.
+        if_none_match: Value of the If-None-Match header.
+        if_modified_since: Value of the If-Modified-Since header.
+
+    Returns: 304 Not Modified response, or None if the response should be sent.
+
+    """
+    not_modified = Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Takes precedence, If-Modified-Since is ignored.
+    if if_none_match is not None:
+        for tag in if_none_match.split(","):
+            # Weak comparison, as GET requires: W/"x" matches "x".
+            if tag.strip().removeprefix("W/") in ("*", headers["ETag"]):
+                return not_modified
+
+        return None
+
+    if if_modified_since is None or "Last-Modified" not in headers:
+        return None
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+
+    # Invalid dates are ignored.
+    except (TypeError, ValueError):
+        return None
+
+    if since.tzinfo is None or parsedate_to_datetime(headers["Last-Modified"]) > since:
+        return None
+
+    return not_modified
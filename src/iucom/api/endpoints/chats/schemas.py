@@ -1,13 +1,21 @@
 from enum import Enum
-from typing import TypeVar
+from typing import Any, Callable, TypeVar
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
 from iucom.common.domains.chats.entities import ChatEntity
-from iucom.common.domains.chats.enums import ChatStatus
-
-__all__ = ("Chat", "Chats", "ChatCreateRequest", "SlowMode", "ChatUpdateRequest")
+from iucom.common.domains.chats.enums import ChatStatus, ChatType as _ChatType, SlowMode as _SlowMode
+
+__all__ = (
+    "Chat",
+    "Chats",
+    "ChatCreateRequest",
+    "SlowMode",
+    "ChatUpdateRequest",
+    "ChatImportError",
+    "ChatsImportResult",
+)
 
 T = TypeVar("T", bound="Chat")
 
@@ -25,6 +33,22 @@ class ChatType(str, Enum):
     CHANNEL = "Channel"
 
 
+_CHAT_TYPES = {type_: getattr(ChatType, type_.name) for type_ in _ChatType}
+_SLOW_MODES = {slow_mode: getattr(SlowMode, slow_mode.name) for slow_mode in _SlowMode}
+# Field of the schema -> how to get it from the entity, and which field of the entity it needs.
+_SERIALIZERS: dict[str, tuple[str, Callable[[ChatEntity], Any]]] = {
+    "id": ("id", lambda entity: entity.id),
+    "title": ("title", lambda entity: entity.title),
+    "course_id": ("course", lambda entity: entity.course),
+    "type": ("type", lambda entity: _CHAT_TYPES[entity.type]),
+    "description": ("description", lambda entity: entity.description),
+    "invite_link": ("telegram_invite_link", lambda entity: entity.telegram_invite_link),
+    "status": ("status", lambda entity: entity.status),
+    "slow_mode": ("slow_mode", lambda entity: _SLOW_MODES[entity.slow_mode]),
+    "all_reactions": ("all_reactions", lambda entity: entity.all_reactions),
+}
+
+
 class Chat(BaseModel):
     @classmethod
     def from_entity(cls: type[T], entity: ChatEntity) -> T:
@@ -40,6 +64,33 @@ class Chat(BaseModel):
             all_reactions=entity.all_reactions,
         )
 
+    @staticmethod
+    def serialize_entity(entity: ChatEntity, *, include: set[str] | None = None) -> dict[str, Any]:
+        # Same as `Chat.from_entity(entity).dict(include=include)`, but without validation.
+        if include is None:
+            return {
+                "id": entity.id,
+                "title": entity.title,
+                "course_id": entity.course,
+                "type": _CHAT_TYPES[entity.type],
+                "description": entity.description,
+                "invite_link": entity.telegram_invite_link,
+                "status": entity.status,
+                "slow_mode": _SLOW_MODES[entity.slow_mode],
+                "all_reactions": entity.all_reactions,
+            }
+
+        # Entity may be read partially, see `get_entity_fields`, so other fields are not touched.
+        return {key: serializer(entity) for key, (_, serializer) in _SERIALIZERS.items() if key in include}
+
+    @staticmethod
+    def get_entity_fields(include: set[str] | None) -> set[str] | None:
+        # Fields of the entity, that are needed to serialize included fields.
+        if include is None:
+            return None
+
+        return {field for key, (field, _) in _SERIALIZERS.items() if key in include}
+
     id: UUID = Field()  # noqa: A003
     title: str = Field()
     course_id: str = Field()
@@ -53,6 +104,7 @@ class Chat(BaseModel):
 
 class Chats(BaseModel):
     chats: list[Chat]
+    next: str | None = Field(default=None, description="Cursor of the next page, if there is any.")  # noqa: A003
 
 
 class ChatCreateRequest(BaseModel):
@@ -69,3 +121,13 @@ class ChatUpdateRequest(BaseModel):
     slow_mode: SlowMode | None = Field(default=None)
     all_reactions: bool | None = Field(default=None)
     description: str | None = Field(default=None)
+
+
+class ChatImportError(BaseModel):
+    line: int = Field()
+    detail: str = Field()
+
+
+class ChatsImportResult(BaseModel):
+    imported: int = Field()
+    errors: list[ChatImportError] = Field()
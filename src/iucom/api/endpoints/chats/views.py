@@ -3,11 +3,21 @@ from io import StringIO
 from typing import Any, AsyncIterator
 from uuid import UUID
 
+import orjson
 from fastapi import APIRouter, Body, File, Header, HTTPException, Path, Query, status
+from fastapi.responses import ORJSONResponse
 from starlette.responses import StreamingResponse
 
-from iucom.api.application import mongodb_storage
-from iucom.api.endpoints.chats.schemas import Chat, ChatCreateRequest, Chats, ChatUpdateRequest
+from iucom.api.application import mongodb_storage, settings
+from iucom.api.caching import build_validators, get_not_modified_response
+from iucom.api.endpoints.chats.schemas import (
+    Chat,
+    ChatCreateRequest,
+    ChatImportError,
+    Chats,
+    ChatsImportResult,
+    ChatUpdateRequest,
+)
 from iucom.common.data.repositories.chats import ChatsRepository
 from iucom.common.domains.chats.entities import ChatEntity, ChatUpdateEntity
 from iucom.common.domains.chats.enums import ChatType, SlowMode
@@ -17,8 +27,13 @@ __all__ = ("router",)
 
 router = APIRouter(tags=["chats"])
 
-repository = ChatsRepository(mongodb_storage)
-interactor = ChatsInteractor(repository)
+repository = ChatsRepository(mongodb_storage, trusted_reads=settings.DATABASE_TRUSTED_READS)
+interactor = ChatsInteractor(
+    repository,
+    cache_ttl=settings.API_CACHE_TTL,
+    cache_size=settings.API_CACHE_SIZE,
+    cache_path=settings.API_CACHE_PATH,
+)
 
 
 async def _generate_csv_file(*, course_id: str | None = None) -> AsyncIterator[bytes]:
@@ -31,30 +46,120 @@ async def _generate_csv_file(*, course_id: str | None = None) -> AsyncIterator[b
     yield _encode("course_id", "invite_link", "title", "type", "slow_mode", "all_reactions", "description")
 
     # Return all courses.
-    async for chat in interactor.filter(course=course_id):
-        serialized_chat = Chat.from_entity(chat)
+    async for chat in interactor.filter(course=course_id, cached=False):
+        serialized_chat = Chat.serialize_entity(chat)
 
         yield _encode(
-            serialized_chat.course_id,
-            serialized_chat.invite_link,
-            serialized_chat.title,
-            serialized_chat.type,
-            serialized_chat.slow_mode.value,
-            serialized_chat.all_reactions,
-            serialized_chat.description,
+            serialized_chat["course_id"],
+            serialized_chat["invite_link"],
+            serialized_chat["title"],
+            serialized_chat["type"],
+            serialized_chat["slow_mode"].value,
+            serialized_chat["all_reactions"],
+            serialized_chat["description"],
         )
 
 
+async def _generate_ndjson_file(
+    *,
+    course_id: str | None = None,
+    limit: int | None = None,
+    after: str | None = None,
+    include: set[str] | None = None,
+) -> AsyncIterator[bytes]:
+    async for chat in interactor.filter(
+        course=course_id, limit=limit, after=after, fields=Chat.get_entity_fields(include), cached=False
+    ):
+        yield orjson.dumps(Chat.serialize_entity(chat, include=include)) + b"\n"
+
+
+async def _generate_json_file(
+    *,
+    course_id: str | None = None,
+    limit: int | None = None,
+    after: str | None = None,
+    include: set[str] | None = None,
+) -> AsyncIterator[bytes]:
+    yield b'{"chats":['
+
+    count = 0
+    last_chat = None
+    async for chat in interactor.filter(
+        course=course_id, limit=limit, after=after, fields=Chat.get_entity_fields(include), cached=False
+    ):
+        yield (b"," if count > 0 else b"") + orjson.dumps(Chat.serialize_entity(chat, include=include))
+        count += 1
+        last_chat = chat
+
+    next_ = interactor.get_cursor(last_chat) if last_chat is not None and count == limit else None
+    yield b'],"next":' + orjson.dumps(next_) + b"}"
+
+
 @router.get("", response_model=Chats, description="Returns all chats for the course.")
-async def get(course_id: str | None = Query(default=None), accept: str = Header(default="application/json")) -> Chats:
+async def get(  # noqa: PLR0913
+    course_id: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    after: str | None = Query(default=None, description="Cursor from the previous page."),
+    fields: list[str] | None = Query(default=None, description="Return only these fields of the chats."),
+    stream: bool = Query(default=False, description="Send chats while they are being read."),  # noqa: FBT001
+    accept: str = Header(default="application/json"),
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+) -> Chats:
+    if accept != "text/csv" and fields is not None and not Chat.__fields__.keys() >= set(fields):
+        raise HTTPException(
+            detail=f"Unknown fields: {set(fields) - Chat.__fields__.keys()}.",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    # Streams are started before reading, so report invalid cursor now.
+    if after is not None:
+        interactor.validate_cursor(after)
+
+    # Answer conditional requests before reading any chats.
+    version = await interactor.get_version(course=course_id)
+    headers = build_validators(version, accept, course_id, limit, after, fields, stream)
+    response = get_not_modified_response(headers, if_none_match=if_none_match, if_modified_since=if_modified_since)
+
+    if response is not None:
+        return response  # type: ignore[return-value]
+
     if accept == "text/csv":
         return StreamingResponse(
             _generate_csv_file(course_id=course_id),
             media_type="text/csv",
-            headers={"Content-Disposition": 'attachment; filename="chats.csv"'},
+            headers={**headers, "Content-Disposition": 'attachment; filename="chats.csv"'},
         )  # type: ignore[return-value]
 
-    return Chats(chats=[Chat.from_entity(entity) async for entity in interactor.filter(course=course_id)])
+    include = set(fields) if fields is not None else None
+
+    if accept == "application/x-ndjson":
+        return StreamingResponse(
+            _generate_ndjson_file(course_id=course_id, limit=limit, after=after, include=include),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )  # type: ignore[return-value]
+
+    if stream:
+        return StreamingResponse(
+            _generate_json_file(course_id=course_id, limit=limit, after=after, include=include),
+            media_type="application/json",
+            headers=headers,
+        )  # type: ignore[return-value]
+
+    entities = [
+        entity
+        async for entity in interactor.filter(
+            course=course_id, limit=limit, after=after, fields=Chat.get_entity_fields(include)
+        )
+    ]
+    next_ = interactor.get_cursor(entities[-1]) if limit is not None and len(entities) == limit else None
+
+    # Serialize directly, response model is used only for documentation.
+    return ORJSONResponse(
+        {"chats": [Chat.serialize_entity(entity, include=include) for entity in entities], "next": next_},
+        headers=headers,
+    )  # type: ignore[return-value]
 
 
 @router.put("", response_model=Chat, description="Create a new chat.")
@@ -84,8 +189,12 @@ async def update(id_: UUID = Path(alias="id"), request: ChatUpdateRequest = Body
     return Chat.from_entity(chat)
 
 
-@router.post("", description="Imports courses from csv file.")
-async def import_(file: bytes = File()) -> None:
+@router.post("", response_model=ChatsImportResult, description="Imports chats from csv file.")
+async def import_(file: bytes = File()) -> ChatsImportResult:
+    chats = []
+    lines = []
+    errors = []
+
     with StringIO(file.decode()) as buffer:
         for i, line in enumerate(csv.reader(buffer)):
             try:
@@ -105,13 +214,17 @@ async def import_(file: bytes = File()) -> None:
                 if i == 0:
                     continue
 
-                raise HTTPException(
-                    detail=f"Cannot parse line: {exception}. Line should be in a form: 'course_id, title, type_, "
-                    f"slow_mode, all_reactions, description'",
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                ) from exception
+                errors.append(
+                    ChatImportError(
+                        line=i + 1,
+                        detail=f"Cannot parse line: {exception}. Line should be in a form: 'course_id, title, type_, "
+                        f"slow_mode, all_reactions, description'",
+                    )
+                )
+                continue
 
-            await interactor.create(
+            lines.append(i + 1)
+            chats.append(
                 ChatEntity(
                     title=chat.title,
                     type=getattr(ChatType, chat.type.name),
@@ -122,6 +235,14 @@ async def import_(file: bytes = File()) -> None:
                 )
             )
 
+    # Do not stop on invalid chats, report them instead.
+    chat_errors = await interactor.create_many(chats)
+    errors.extend(ChatImportError(line=lines[i], detail=str(error)) for i, error in chat_errors.items())
+
+    return ChatsImportResult(
+        imported=len(chats) - len(chat_errors), errors=sorted(errors, key=lambda error: error.line)
+    )
+
 
 @router.delete("/{id:uuid}", status_code=status.HTTP_204_NO_CONTENT, description="Delete a chat.")
 async def delete(id_: UUID = Path(alias="id")) -> None:
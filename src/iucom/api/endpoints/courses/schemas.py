@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import TypeVar
+from typing import Any, Callable, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -22,6 +22,29 @@ class CourseDegree(str, Enum):
     BACHELORS = "bachelors"
 
 
+_COURSE_TYPES = {
+    _CourseType.UNKNOWN: None,
+    _CourseType.CORE: CourseType.CORE,
+    _CourseType.TECHNICAL_ELECTIVE: CourseType.TECHNICAL_ELECTIVE,
+    _CourseType.HUMANITARIAN_ELECTIVE: CourseType.HUMANITARIC_ELECTIVE,
+}
+_COURSE_DEGREES = {
+    _CourseDegree.UNKNOWN: None,
+    _CourseDegree.MASTERS: CourseDegree.MASTERS,
+    _CourseDegree.BACHELORS: CourseDegree.BACHELORS,
+}
+# Field of the schema -> how to get it from the entity, and which field of the entity it needs.
+_SERIALIZERS: dict[str, tuple[str, Callable[[CourseEntity], Any]]] = {
+    "id": ("id", lambda entity: entity.id),
+    "full_name": ("full_name", lambda entity: entity.full_name),
+    "short_name": ("short_name", lambda entity: entity.short_name),
+    "year": ("year", lambda entity: entity.year),
+    "moodle_id": ("moodle", lambda entity: entity.moodle),
+    "type": ("type", lambda entity: _COURSE_TYPES[entity.type]),
+    "degree": ("degree", lambda entity: _COURSE_DEGREES[entity.degree]),
+}
+
+
 class Course(BaseModel):
     @classmethod
     def from_entity(cls: type[T], entity: CourseEntity) -> T:
@@ -45,6 +68,31 @@ class Course(BaseModel):
             degree=getattr(CourseDegree, entity.degree.name) if entity.degree != _CourseDegree.UNKNOWN else None,
         )
 
+    @staticmethod
+    def serialize_entity(entity: CourseEntity, *, include: set[str] | None = None) -> dict[str, Any]:
+        # Same as `Course.from_entity(entity).dict(include=include)`, but without validation.
+        if include is None:
+            return {
+                "id": entity.id,
+                "full_name": entity.full_name,
+                "short_name": entity.short_name,
+                "year": entity.year,
+                "moodle_id": entity.moodle,
+                "type": _COURSE_TYPES[entity.type],
+                "degree": _COURSE_DEGREES[entity.degree],
+            }
+
+        # Entity may be read partially, see `get_entity_fields`, so other fields are not touched.
+        return {key: serializer(entity) for key, (_, serializer) in _SERIALIZERS.items() if key in include}
+
+    @staticmethod
+    def get_entity_fields(include: set[str] | None) -> set[str] | None:
+        # Fields of the entity, that are needed to serialize included fields.
+        if include is None:
+            return None
+
+        return {field for key, (field, _) in _SERIALIZERS.items() if key in include}
+
     id: str = Field()  # noqa: A003
     full_name: str = Field()
     short_name: str = Field()
@@ -77,3 +125,4 @@ class Course(BaseModel):
 
 class Courses(BaseModel):
     courses: list[Course] = Field()
+    next: str | None = Field(default=None, description="Cursor of the next page, if there is any.")  # noqa: A003
@@ -2,10 +2,13 @@ import csv
 from io import StringIO
 from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, File, Header, HTTPException, Path, status
+import orjson
+from fastapi import APIRouter, File, Header, HTTPException, Path, Query, status
+from fastapi.responses import ORJSONResponse
 from starlette.responses import StreamingResponse
 
-from iucom.api.application import mongodb_storage
+from iucom.api.application import mongodb_storage, settings
+from iucom.api.caching import build_validators, get_not_modified_response
 from iucom.api.endpoints.courses.schemas import Course, Courses
 from iucom.common.data.repositories.cources import CoursesMongoDBRepository
 from iucom.common.domains.cources.interactors import CoursesInteractor
@@ -13,8 +16,13 @@ from iucom.common.domains.cources.interactors import CoursesInteractor
 __all__ = ("router",)
 
 router = APIRouter(tags=["courses"])
-repository = CoursesMongoDBRepository(mongodb_storage)
-interactor = CoursesInteractor(repository)
+repository = CoursesMongoDBRepository(mongodb_storage, trusted_reads=settings.DATABASE_TRUSTED_READS)
+interactor = CoursesInteractor(
+    repository,
+    cache_ttl=settings.API_CACHE_TTL,
+    cache_size=settings.API_CACHE_SIZE,
+    cache_path=settings.API_CACHE_PATH,
+)
 
 
 async def _generate_csv_file() -> AsyncIterator[bytes]:
@@ -27,30 +35,107 @@ async def _generate_csv_file() -> AsyncIterator[bytes]:
     yield _encode("id", "moodle_id", "full_name", "short_name", "year", "type", "degree")
 
     # Return all courses.
-    async for course in interactor.filter():
-        serialized_course = Course.from_entity(course)
+    async for course in interactor.filter(cached=False):
+        serialized_course = Course.serialize_entity(course)
 
         yield _encode(
-            serialized_course.id,
-            serialized_course.moodle_id,
-            serialized_course.full_name,
-            serialized_course.short_name,
-            serialized_course.year,
-            serialized_course.type,
-            serialized_course.degree,
+            serialized_course["id"],
+            serialized_course["moodle_id"],
+            serialized_course["full_name"],
+            serialized_course["short_name"],
+            serialized_course["year"],
+            serialized_course["type"],
+            serialized_course["degree"],
         )
 
 
+async def _generate_ndjson_file(
+    *, limit: int | None = None, after: str | None = None, include: set[str] | None = None
+) -> AsyncIterator[bytes]:
+    async for course in interactor.filter(
+        limit=limit, after=after, fields=Course.get_entity_fields(include), cached=False
+    ):
+        yield orjson.dumps(Course.serialize_entity(course, include=include)) + b"\n"
+
+
+async def _generate_json_file(
+    *, limit: int | None = None, after: str | None = None, include: set[str] | None = None
+) -> AsyncIterator[bytes]:
+    yield b'{"courses":['
+
+    count = 0
+    last_course = None
+    async for course in interactor.filter(
+        limit=limit, after=after, fields=Course.get_entity_fields(include), cached=False
+    ):
+        yield (b"," if count > 0 else b"") + orjson.dumps(Course.serialize_entity(course, include=include))
+        count += 1
+        last_course = course
+
+    next_ = interactor.get_cursor(last_course) if last_course is not None and count == limit else None
+    yield b'],"next":' + orjson.dumps(next_) + b"}"
+
+
 @router.get("", description="Returns all courses.")
-async def get(accept: str = Header(default="application/json")) -> Courses:
+async def get(  # noqa: PLR0913
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    after: str | None = Query(default=None, description="Cursor from the previous page."),
+    fields: list[str] | None = Query(default=None, description="Return only these fields of the courses."),
+    stream: bool = Query(default=False, description="Send courses while they are being read."),  # noqa: FBT001
+    accept: str = Header(default="application/json"),
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+) -> Courses:
+    if accept != "text/csv" and fields is not None and not Course.__fields__.keys() >= set(fields):
+        raise HTTPException(
+            detail=f"Unknown fields: {set(fields) - Course.__fields__.keys()}.",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    # Streams are started before reading, so report invalid cursor now.
+    if after is not None:
+        interactor.validate_cursor(after)
+
+    # Answer conditional requests before reading any courses.
+    headers = build_validators(await interactor.get_version(), accept, limit, after, fields, stream)
+    response = get_not_modified_response(headers, if_none_match=if_none_match, if_modified_since=if_modified_since)
+
+    if response is not None:
+        return response  # type: ignore[return-value]
+
     if accept == "text/csv":
         return StreamingResponse(
             _generate_csv_file(),
             media_type="text/csv",
-            headers={"Content-Disposition": 'attachment; filename="courses.csv"'},
+            headers={**headers, "Content-Disposition": 'attachment; filename="courses.csv"'},
         )  # type: ignore[return-value]
 
-    return Courses(courses=[Course.from_entity(course) async for course in interactor.filter()])
+    include = set(fields) if fields is not None else None
+
+    if accept == "application/x-ndjson":
+        return StreamingResponse(
+            _generate_ndjson_file(limit=limit, after=after, include=include),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )  # type: ignore[return-value]
+
+    if stream:
+        return StreamingResponse(
+            _generate_json_file(limit=limit, after=after, include=include),
+            media_type="application/json",
+            headers=headers,
+        )  # type: ignore[return-value]
+
+    entities = [
+        entity async for entity in interactor.filter(limit=limit, after=after, fields=Course.get_entity_fields(include))
+    ]
+    next_ = interactor.get_cursor(entities[-1]) if limit is not None and len(entities) == limit else None
+
+    # Serialize directly, response model is used only for documentation.
+    return ORJSONResponse(
+        {"courses": [Course.serialize_entity(entity, include=include) for entity in entities], "next": next_},
+        headers=headers,
+    )  # type: ignore[return-value]
 
 
 @router.delete("/{id:str}", status_code=status.HTTP_204_NO_CONTENT, description="Delete a course.")
@@ -60,6 +145,8 @@ async def delete(id_: str = Path(alias="id")) -> None:
 
 @router.post("", description="Imports courses from csv file.")
 async def import_(file: bytes = File()) -> None:
+    courses = []
+
     with StringIO(file.decode()) as buffer:
         for i, line in enumerate(csv.reader(buffer)):
             try:
@@ -86,7 +173,9 @@ async def import_(file: bytes = File()) -> None:
                     status_code=status.HTTP_400_BAD_REQUEST,
                 ) from exception
 
-            await interactor.upsert(course.to_entity())
+            courses.append(course.to_entity())
+
+    await interactor.upsert_many(courses)
 
 
 @router.on_event("startup")
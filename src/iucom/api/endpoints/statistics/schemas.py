@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from iucom.common.domains.statistics.entities import ChatActivityEntity, MessagesBucketEntity, UserActivityEntity
+from iucom.common.domains.statistics.enums import StatisticsUnit
+
+__all__ = ("ChatActivity", "ChatsActivity", "UserActivity", "UsersActivity", "MessagesBucket", "MessagesSeries")
+
+TC = TypeVar("TC", bound="ChatActivity")
+TU = TypeVar("TU", bound="UserActivity")
+TM = TypeVar("TM", bound="MessagesBucket")
+
+
+class ChatActivity(BaseModel):
+    @classmethod
+    def from_entity(cls: type[TC], entity: ChatActivityEntity) -> TC:
+        return cls(
+            chat_id=entity.chat,
+            messages=entity.messages,
+            length=entity.length,
+            last_message_at=entity.last_message_at,
+        )
+
+    chat_id: UUID = Field()
+    messages: int = Field(description="Number of messages.")
+    length: int = Field(description="Total length of messages.")
+    last_message_at: datetime = Field()
+
+
+class ChatsActivity(BaseModel):
+    chats: list[ChatActivity] = Field(description="The most active chats first.")
+
+
+class UserActivity(BaseModel):
+    @classmethod
+    def from_entity(cls: type[TU], entity: UserActivityEntity) -> TU:
+        return cls(user_id=entity.user, messages=entity.messages, length=entity.length)
+
+    user_id: UUID = Field(description="Pseudonymized id of the user.")
+    messages: int = Field(description="Number of messages.")
+    length: int = Field(description="Total length of messages.")
+
+
+class UsersActivity(BaseModel):
+    users: list[UserActivity] = Field(description="The most active users first.")
+
+
+class MessagesBucket(BaseModel):
+    @classmethod
+    def from_entity(cls: type[TM], entity: MessagesBucketEntity) -> TM:
+        return cls(start=entity.start, messages=entity.messages, length=entity.length)
+
+    start: datetime = Field()
+    messages: int = Field(description="Number of messages.")
+    length: int = Field(description="Total length of messages.")
+
+
+class MessagesSeries(BaseModel):
+    unit: StatisticsUnit = Field()
+    buckets: list[MessagesBucket] = Field(description="Only buckets with messages, oldest first.")
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Path, Query
+
+from iucom.api.application import mongodb_storage, settings
+from iucom.api.endpoints.statistics.schemas import (
+    ChatActivity,
+    ChatsActivity,
+    MessagesBucket,
+    MessagesSeries,
+    UserActivity,
+    UsersActivity,
+)
+from iucom.common.data.repositories.chats import ChatsRepository
+from iucom.common.data.repositories.statistics import StatisticsRepository
+from iucom.common.domains.chats.interactors import ChatsInteractor
+from iucom.common.domains.statistics.enums import StatisticsUnit
+from iucom.common.domains.statistics.interactors import StatisticsInteractor
+
+__all__ = ("router",)
+
+router = APIRouter(tags=["statistics"])
+
+repository = StatisticsRepository(
+    mongodb_storage,
+    collection=settings.STATISTICS_COLLECTION,
+    time_series=settings.STATISTICS_TIME_SERIES,
+    # Written by the sync only.
+    read_only=True,
+)
+chats_repository = ChatsRepository(mongodb_storage, trusted_reads=settings.DATABASE_TRUSTED_READS)
+interactor = StatisticsInteractor(
+    repository,
+    ChatsInteractor(chats_repository),
+    cache_ttl=settings.STATISTICS_CACHE_TTL,
+    cache_size=settings.STATISTICS_CACHE_SIZE,
+)
+
+
+def _to_utc(value: datetime | None) -> datetime | None:
+    # Time without timezone is considered as UTC.
+    if value is None or value.tzinfo is not None:
+        return value
+
+    return value.replace(tzinfo=timezone.utc)
+
+
+@router.get("/chats", response_model=ChatsActivity, description="Returns activity of chats.")
+async def get_chats(
+    chat_ids: list[UUID] | None = Query(default=None, alias="chat_id", description="All chats, if not set."),
+    since: datetime | None = Query(default=None, description="Start of the period, rounded down to hours."),
+    until: datetime | None = Query(default=None, description="End of the period."),
+) -> ChatsActivity:
+    entities = await interactor.get_chats_activity(chat_ids, since=_to_utc(since), until=_to_utc(until))
+    return ChatsActivity(chats=[ChatActivity.from_entity(entity) for entity in entities])
+
+
+@router.get("/courses/{id:str}/users", response_model=UsersActivity, description="Returns top users of a course.")
+async def get_course_users(
+    id_: str = Path(alias="id"),
+    limit: int = Query(default=10, ge=1, le=100),
+    since: datetime | None = Query(default=None, description="Start of the period."),
+    until: datetime | None = Query(default=None, description="End of the period."),
+) -> UsersActivity:
+    entities = await interactor.get_top_users(id_, since=_to_utc(since), until=_to_utc(until), limit=limit)
+    return UsersActivity(users=[UserActivity.from_entity(entity) for entity in entities])
+
+
+@router.get("/messages", response_model=MessagesSeries, description="Returns number of messages over time.")
+async def get_messages(
+    chat_ids: list[UUID] | None = Query(default=None, alias="chat_id", description="All chats, if not set."),
+    unit: StatisticsUnit = Query(default=StatisticsUnit.DAY),
+    since: datetime | None = Query(default=None, description="Start of the period, rounded down to hours."),
+    until: datetime | None = Query(default=None, description="End of the period."),
+) -> MessagesSeries:
+    entities = await interactor.get_messages_series(chat_ids, unit=unit, since=_to_utc(since), until=_to_utc(until))
+    return MessagesSeries(unit=unit, buckets=[MessagesBucket.from_entity(entity) for entity in entities])
+
+
+@router.on_event("startup")
+async def on_startup() -> None:
+    await repository
+    await chats_repository
+
+
+@router.on_event("shutdown")
+async def on_shutdown() -> None:
+    await interactor.shutdown()
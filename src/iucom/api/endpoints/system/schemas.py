@@ -2,8 +2,20 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
-__all__ = ("Status",)
+__all__ = ("Status", "Pool")
 
 
 class Status(BaseModel):
     status: Literal["ok"] = Field(default="ok")
+
+
+class Pool(BaseModel):
+    pid: int = Field(description="Worker, that answered. Each worker has its own pool.")
+    max_size: int = Field()
+    open: int = Field()  # noqa: A003
+    in_use: int = Field()
+    idle: int = Field()
+    created: int = Field(description="Connections opened since the start.")
+    checkouts: int = Field()
+    checkout_failures: int = Field()
+    waiting: int = Field(description="Operations, that wait for a free connection.")
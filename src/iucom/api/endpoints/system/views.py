@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from iucom.api.endpoints.system.schemas import Status
+from iucom.api.application import mongodb_storage
+from iucom.api.endpoints.system.schemas import Pool, Status
 
 router = APIRouter(
     tags=[
@@ -12,3 +13,8 @@ router = APIRouter(
 @router.get("/status", response_model=Status, description="Returns OK if system if online.")
 async def status() -> Status:
     return Status()
+
+
+@router.get("/pool", response_model=Pool, description="Returns MongoDB connections of the worker.")
+async def pool() -> Pool:
+    return Pool(**mongodb_storage.get_pool_metrics())
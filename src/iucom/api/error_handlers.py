@@ -3,13 +3,15 @@ from fastapi.responses import ORJSONResponse
 
 from iucom.api.application import application
 from iucom.common.domains.chats.errors import ChatsError, ChatsInvalidError, ChatsNotFoundError
-from iucom.common.domains.cources.errors import CoursesError, CoursesNotFoundError
+from iucom.common.domains.cources.errors import CoursesError, CoursesInvalidError, CoursesNotFoundError
+from iucom.common.domains.statistics.errors import StatisticsError, StatisticsInvalidError
 
 __all__ = ("error_handler", "chat_invalid_error_handler", "not_found_error_handler")
 
 
 @application.exception_handler(ChatsError)
 @application.exception_handler(CoursesError)
+@application.exception_handler(StatisticsError)
 def error_handler(_, exception: ChatsError) -> ORJSONResponse:
     return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -18,7 +20,11 @@ def error_handler(_, exception: ChatsError) -> ORJSONResponse:
 
 
 @application.exception_handler(ChatsInvalidError)
-def chat_invalid_error_handler(_, exception: ChatsInvalidError) -> ORJSONResponse:
+@application.exception_handler(CoursesInvalidError)
+@application.exception_handler(StatisticsInvalidError)
+def chat_invalid_error_handler(
+    _, exception: ChatsInvalidError | CoursesInvalidError | StatisticsInvalidError
+) -> ORJSONResponse:
     return ORJSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content={"detail": str(exception)})
 
 
@@ -1,33 +1,76 @@
+import base64
 import dataclasses
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from dataclasses import asdict
-from typing import Any, AsyncContextManager, AsyncIterator
+from datetime import datetime, timezone
+from typing import Any, AsyncContextManager, AsyncIterator, Collection, Sequence
 from uuid import UUID
 
-from pymongo import ASCENDING, IndexModel
+import orjson
+from pymongo import ASCENDING, DESCENDING, IndexModel, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 
 from iucom.common.data.storages.mongodb import MongoDBStorage
 from iucom.common.domains.chats.entities import ChatEntity
-from iucom.common.domains.chats.enums import ChatStatus
-from iucom.common.domains.chats.errors import ChatsError, ChatsModifiedError, ChatsNotFoundError
-from iucom.common.utils import AsyncLazyObject
+from iucom.common.domains.chats.enums import ChatStatus, ChatType, SlowMode
+from iucom.common.domains.chats.errors import (
+    ChatsError,
+    ChatsInvalidError,
+    ChatsModifiedError,
+    ChatsNotFoundError,
+    ChatsNotSupportedError,
+)
+from iucom.common.utils import AsyncLazyObject, construct_dataclass, construct_partial_dataclass
 
 __all__ = ("ChatsRepository",)
 
+# Chats, that should be synced. Listed explicitly, so the query can use the partial index.
+_NOT_SYNCED_STATUSES = [status.value for status in ChatStatus if status != ChatStatus.SYNCED]
+# "The $changeStream stage is only supported on replica sets".
+_CHANGE_STREAM_NOT_SUPPORTED = 40573
+# Stored representation -> entity, for fields, that differ. See `__deserialize_partial`.
+_CONVERTERS: dict[str, Any] = {
+    "type": ChatType,
+    "status": ChatStatus,
+    "slow_mode": SlowMode,
+    "id": UUID,
+    "updated": lambda updated: datetime.fromtimestamp(updated / 1000, tz=timezone.utc),
+}
+
 
 class ChatsRepository(AsyncLazyObject):
-    async def __ainit__(self, storage: MongoDBStorage, *, collection: str = "chats") -> None:
+    async def __ainit__(
+        self, storage: MongoDBStorage, *, collection: str = "chats", trusted_reads: bool = False
+    ) -> None:
         self.__storage = storage
         self.__collection = storage.client[collection]
+        # Course (None for all chats) -> time of the last delete, see `get_version`.
+        self.__deletions_collection = storage.client[f"{collection}_deletions"]
+        # Build entities from stored documents without validation.
+        self.__trusted_reads = trusted_reads
 
         await self.__collection.create_indexes(
             [
                 IndexModel((("id", ASCENDING),), name="chats_id_idx", unique=True),
-                IndexModel((("course", ASCENDING),), name="chats_course_idx"),
-                IndexModel((("updated", ASCENDING),), name="chats_updated_idx"),
+                IndexModel((("telegram_entity", ASCENDING),), name="chats_telegram_entity_idx"),
+                # Keyset pagination, see `filter`.
+                IndexModel((("updated", ASCENDING), ("id", ASCENDING)), name="chats_updated_id_idx"),
+                IndexModel(
+                    (("course", ASCENDING), ("updated", ASCENDING), ("id", ASCENDING)),
+                    name="chats_course_updated_id_idx",
+                ),
+                # Only chats, that should be synced, so the incremental sync depends on the backlog size.
+                IndexModel(
+                    (("status", ASCENDING), ("updated", ASCENDING), ("id", ASCENDING)),
+                    name="chats_not_synced_status_updated_id_idx",
+                    partialFilterExpression={"status": {"$in": _NOT_SYNCED_STATUSES}},
+                ),
             ]
         )
 
+        # Released in `shutdown`.
+        storage.acquire()
+
     async def get(self, *, id_: UUID | None = None, telegram_entity: int | None = None) -> ChatEntity | None:
         if (id_ is None) == (telegram_entity is None):
             message = "You should provide id or telegram_entity."
@@ -40,25 +83,133 @@ class ChatsRepository(AsyncLazyObject):
         if entity is None:
             return None
 
-        return ChatEntity(**entity)
+        return self.__deserialize(entity, trusted=self.__trusted_reads)
 
     async def filter(  # noqa: A003
-        self, *, exclude_synced: bool = False, course: str | None = None
+        self,
+        *,
+        exclude_synced: bool = False,
+        course: str | None = None,
+        ids: Collection[UUID] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
+        fields: Collection[str] | None = None,
     ) -> AsyncIterator[ChatEntity]:
         query: dict[str, Any] = {}
 
         if course is not None:
             query["course"] = course
 
+        if ids is not None:
+            query["id"] = {"$in": [str(id_) for id_ in ids]}
+
         if exclude_synced:
-            query["status"] = {"$ne": ChatStatus.SYNCED.value}
+            query["status"] = {"$in": _NOT_SYNCED_STATUSES}
+
+        if after is not None:
+            updated, id_ = self.decode_cursor(after)
+            query["$or"] = [{"updated": {"$gt": updated}}, {"updated": updated, "id": {"$gt": id_}}]
+
+        # Partial entities can not be validated, so only trusted reads are projected.
+        if fields is None or not self.__trusted_reads:
+            async for entity in self.__collection.find(
+                query,
+                {"_id": False},
+                sort=[("updated", ASCENDING), ("id", ASCENDING)],
+                limit=limit if limit is not None else 0,
+            ):
+                yield self.__deserialize(entity, trusted=self.__trusted_reads)
+
+            return
+
+        # Cursor of the page is built from these.
+        fields = {*fields, "updated", "id"}
+
+        async for entity in self.__collection.find(
+            query,
+            {"_id": False, **{field: True for field in fields}},
+            sort=[("updated", ASCENDING), ("id", ASCENDING)],
+            limit=limit if limit is not None else 0,
+        ):
+            try:
+                yield self.__deserialize_partial(entity, fields=fields)
+
+            # Documents written by older versions may be incomplete, read and validate the whole.
+            except (KeyError, ValueError):
+                document = await self.__collection.find_one({"id": entity["id"]}, {"_id": False})
+
+                # Deleted meanwhile.
+                if document is not None:
+                    yield self.__deserialize(document, trusted=False)
+
+    async def get_version(self, *, course: str | None = None) -> tuple[int, datetime | None]:
+        # Number of chats and the last update or delete, changes on every write. Both use indexes,
+        # the number of all chats is taken from the collection metadata.
+        if course is not None:
+            count = await self.__collection.count_documents({"course": course})
+            last = await self.__collection.find_one(
+                {"course": course}, {"_id": False, "updated": True}, sort=[("updated", DESCENDING)]
+            )
+
+        else:
+            count = await self.__collection.estimated_document_count()
+            last = await self.__collection.find_one({}, {"_id": False, "updated": True}, sort=[("updated", DESCENDING)])
+
+        deletion = await self.__deletions_collection.find_one({"_id": course})
+        updated = max(last["updated"] if last is not None else 0, deletion["deleted"] if deletion is not None else 0)
+
+        return count, datetime.fromtimestamp(updated / 1000, tz=timezone.utc) if updated > 0 else None
+
+    async def watch(self) -> AsyncIterator[tuple[UUID | None, ChatEntity | None]]:
+        # Requires a replica set. Yields id and the changed chat, or None if the chat does not exist
+        # anymore. Ids of deleted chats are taken from pre-images (MongoDB 6.0+), None without them.
+        with suppress(OperationFailure):
+            await self.__collection.database.command(
+                "collMod", self.__collection.name, changeStreamPreAndPostImages={"enabled": True}
+            )
+
+        try:
+            async with self.__collection.watch(
+                full_document="updateLookup", full_document_before_change="whenAvailable"
+            ) as stream:
+                async for change in stream:
+                    document = change.get("fullDocument")
+
+                    if document is not None:
+                        entity = self.__deserialize(document, trusted=self.__trusted_reads)
+                        yield entity.id, entity
+                        continue
+
+                    before = change.get("fullDocumentBeforeChange")
+                    yield UUID(before["id"]) if before is not None else None, None
+
+        except OperationFailure as exception:
+            if exception.code != _CHANGE_STREAM_NOT_SUPPORTED:
+                raise
 
-        async for entity in self.__collection.find(query, sort=[("updated", ASCENDING)]):
-            yield ChatEntity(**entity)
+            message = "Cannot watch chats, change streams require a replica set."
+            raise ChatsNotSupportedError(message) from exception
 
     async def insert(self, entity: ChatEntity) -> None:
         await self.__collection.insert_one(self.__serialize(entity))
 
+    async def insert_many(self, entities: Sequence[ChatEntity], *, chunk_size: int = 1000) -> dict[int, ChatsError]:
+        errors: dict[int, ChatsError] = {}
+
+        for offset in range(0, len(entities), chunk_size):
+            try:
+                await self.__collection.bulk_write(
+                    [InsertOne(self.__serialize(entity)) for entity in entities[offset : offset + chunk_size]],
+                    ordered=False,
+                )
+
+            # Other entities are inserted anyway, since write is unordered.
+            except BulkWriteError as exception:
+                for error in exception.details["writeErrors"]:
+                    errors[offset + error["index"]] = ChatsError(error["errmsg"])
+
+        return errors
+
     @asynccontextmanager
     async def update(self, id_: UUID) -> AsyncIterator[ChatEntity]:
         old_entity = await self.get(id_=id_)
@@ -72,18 +223,47 @@ class ChatsRepository(AsyncLazyObject):
             yield new_entity
 
     async def update_by_filter(
-        self, *, exclude_synced: bool = False, course: str | None = None
+        self, *, exclude_synced: bool = False, course: str | None = None, ids: Collection[UUID] | None = None
     ) -> AsyncIterator[AsyncContextManager[ChatEntity]]:
-        async for entity in self.filter(exclude_synced=exclude_synced, course=course):
+        async for entity in self.filter(exclude_synced=exclude_synced, course=course, ids=ids):
             yield self.__update(entity)
 
     async def delete(self, id_: UUID) -> bool:
-        result = await self.__collection.delete_one({"id": str(id_)})
-        return result.deleted_count == 1
+        entity = await self.__collection.find_one_and_delete({"id": str(id_)}, {"_id": False, "course": True})
+
+        if entity is None:
+            return False
+
+        # Deletes do not leave documents with `updated`, so versions see them through this.
+        deleted = int(datetime.now(tz=timezone.utc).timestamp() * 1000)
+        await self.__deletions_collection.bulk_write(
+            [
+                UpdateOne({"_id": key}, {"$max": {"deleted": deleted}}, upsert=True)
+                for key in (entity.get("course"), None)
+            ],
+            ordered=False,
+        )
+
+        return True
 
     async def shutdown(self) -> None:
         await self.__storage.shutdown()
 
+    @staticmethod
+    def get_cursor(entity: ChatEntity) -> str:
+        # Position right after the entity, in `filter` order.
+        return base64.urlsafe_b64encode(orjson.dumps([int(entity.updated.timestamp() * 1000), str(entity.id)])).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[int, str]:
+        try:
+            updated, id_ = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return int(updated), str(UUID(id_))
+
+        except Exception as exception:
+            message = f"Invalid cursor: '{cursor}'."
+            raise ChatsInvalidError(message) from exception
+
     @staticmethod
     def __serialize(entity: ChatEntity) -> dict[str, Any]:
         serialized = asdict(entity)
@@ -96,6 +276,39 @@ class ChatsRepository(AsyncLazyObject):
 
         return serialized
 
+    @staticmethod
+    def __deserialize(document: dict[str, Any], *, trusted: bool) -> ChatEntity:
+        if trusted:
+            # Documents written by older versions may be incomplete, validate them.
+            with suppress(KeyError, ValueError):
+                return construct_dataclass(
+                    ChatEntity,
+                    title=document["title"],
+                    course=document["course"],
+                    type=ChatType(document["type"]),
+                    description=document["description"],
+                    status=ChatStatus(document["status"]),
+                    slow_mode=SlowMode(document["slow_mode"]),
+                    all_reactions=document["all_reactions"],
+                    telegram_entity=document["telegram_entity"],
+                    telegram_invite_link=document["telegram_invite_link"],
+                    id=UUID(document["id"]),
+                    updated=datetime.fromtimestamp(document["updated"] / 1000, tz=timezone.utc),
+                )
+
+        return ChatEntity(**document)
+
+    @staticmethod
+    def __deserialize_partial(document: dict[str, Any], *, fields: Collection[str]) -> ChatEntity:
+        # Only requested fields are set, others raise on access.
+        return construct_partial_dataclass(
+            ChatEntity,
+            **{
+                field: _CONVERTERS[field](document[field]) if field in _CONVERTERS else document[field]
+                for field in fields
+            },
+        )
+
     @asynccontextmanager
     async def __update(self, new_entity: ChatEntity) -> AsyncIterator[ChatEntity]:
         # Copy entity before changing.
@@ -1,39 +1,179 @@
+import base64
+from contextlib import suppress
 from dataclasses import asdict
-from typing import AsyncIterator
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Collection, Sequence
 
-from pymongo import ASCENDING, IndexModel
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
 
 from iucom.common.data.storages.mongodb import MongoDBStorage
 from iucom.common.domains.cources.entities import CourseEntity
-from iucom.common.utils import AsyncLazyObject
+from iucom.common.domains.cources.enums import CourseDegree, CourseType
+from iucom.common.domains.cources.errors import CoursesInvalidError
+from iucom.common.utils import AsyncLazyObject, construct_dataclass, construct_partial_dataclass
 
 __all__ = ("CoursesMongoDBRepository",)
 
+# Stored representation -> entity, for fields, that differ. See `__deserialize_partial`.
+_CONVERTERS: dict[str, Any] = {"type": CourseType, "degree": CourseDegree}
+
 
 class CoursesMongoDBRepository(AsyncLazyObject):
-    async def __ainit__(self, storage: MongoDBStorage, *, collection: str = "courses") -> None:
+    async def __ainit__(
+        self, storage: MongoDBStorage, *, collection: str = "courses", trusted_reads: bool = False
+    ) -> None:
         self.__storage = storage
         self.__collection = storage.client[collection]
-        await self.__collection.create_indexes([IndexModel((("id", ASCENDING),), name="courses_id_idx", unique=True)])
+        # Time of the last delete, see `get_version`.
+        self.__deletions_collection = storage.client[f"{collection}_deletions"]
+        # Build entities from stored documents without validation.
+        self.__trusted_reads = trusted_reads
+        await self.__collection.create_indexes(
+            [
+                IndexModel((("id", ASCENDING),), name="courses_id_idx", unique=True),
+                # Version of the collection, see `get_version`.
+                IndexModel((("updated", ASCENDING),), name="courses_updated_idx"),
+            ]
+        )
+
+        # Released in `shutdown`.
+        storage.acquire()
 
     async def get(self, id_: str) -> CourseEntity | None:
-        entity = await self.__collection.find_one({"id": str(id_)})
+        entity = await self.__collection.find_one({"id": str(id_)}, {"_id": False, "updated": False})
 
         if entity is None:
             return None
 
-        return CourseEntity(**entity)
+        return self.__deserialize(entity, trusted=self.__trusted_reads)
+
+    async def filter(  # noqa: A003
+        self, *, limit: int | None = None, after: str | None = None, fields: Collection[str] | None = None
+    ) -> AsyncIterator[CourseEntity]:
+        query = {"id": {"$gt": self.decode_cursor(after)}} if after is not None else {}
+
+        # Partial entities can not be validated, so only trusted reads are projected.
+        if fields is None or not self.__trusted_reads:
+            async for entity in self.__collection.find(
+                query,
+                {"_id": False, "updated": False},
+                sort=[("id", ASCENDING)],
+                limit=limit if limit is not None else 0,
+            ):
+                yield self.__deserialize(entity, trusted=self.__trusted_reads)
+
+            return
+
+        # Cursor of the page is built from it.
+        fields = {*fields, "id"}
 
-    async def filter(self) -> AsyncIterator[CourseEntity]:  # noqa: A003
-        async for entity in self.__collection.find({}):
-            yield CourseEntity(**entity)
+        async for entity in self.__collection.find(
+            query,
+            {"_id": False, **{field: True for field in fields}},
+            sort=[("id", ASCENDING)],
+            limit=limit if limit is not None else 0,
+        ):
+            try:
+                yield self.__deserialize_partial(entity, fields=fields)
+
+            # Documents written by older versions may be incomplete, read and validate the whole.
+            except (KeyError, ValueError):
+                document = await self.__collection.find_one({"id": entity["id"]}, {"_id": False, "updated": False})
+
+                # Deleted meanwhile.
+                if document is not None:
+                    yield self.__deserialize(document, trusted=False)
+
+    async def get_version(self) -> tuple[int, datetime | None]:
+        # Number of courses and the last update or delete, changes on every write. The number is
+        # taken from the collection metadata, the last update from the index.
+        count = await self.__collection.estimated_document_count()
+        last = await self.__collection.find_one({}, {"_id": False, "updated": True}, sort=[("updated", DESCENDING)])
+        deletion = await self.__deletions_collection.find_one({"_id": None})
+
+        # Courses written by older versions have no update time.
+        updated = max(
+            last.get("updated", 0) if last is not None else 0, deletion["deleted"] if deletion is not None else 0
+        )
+
+        return count, datetime.fromtimestamp(updated / 1000, tz=timezone.utc) if updated > 0 else None
 
     async def upsert(self, entity: CourseEntity) -> None:
-        await self.__collection.update_one({"id": entity.id}, {"$set": asdict(entity)}, upsert=True)
+        await self.__collection.update_one({"id": entity.id}, {"$set": self.__serialize(entity)}, upsert=True)
+
+    async def upsert_many(self, entities: Sequence[CourseEntity], *, chunk_size: int = 1000) -> None:
+        for offset in range(0, len(entities), chunk_size):
+            await self.__collection.bulk_write(
+                [
+                    UpdateOne({"id": entity.id}, {"$set": self.__serialize(entity)}, upsert=True)
+                    for entity in entities[offset : offset + chunk_size]
+                ],
+                ordered=False,
+            )
 
     async def delete(self, id_: str) -> bool:
         result = await self.__collection.delete_one({"id": id_})
-        return result.deleted_count == 1
+
+        if result.deleted_count == 0:
+            return False
+
+        # Deletes do not leave documents with `updated`, so the version sees them through this.
+        deleted = int(datetime.now(tz=timezone.utc).timestamp() * 1000)
+        await self.__deletions_collection.update_one({"_id": None}, {"$max": {"deleted": deleted}}, upsert=True)
+
+        return True
 
     async def shutdown(self) -> None:
         await self.__storage.shutdown()
+
+    @staticmethod
+    def get_cursor(entity: CourseEntity) -> str:
+        # Position right after the entity, in `filter` order.
+        return base64.urlsafe_b64encode(entity.id.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> str:
+        try:
+            return base64.urlsafe_b64decode(cursor.encode()).decode()
+
+        except Exception as exception:
+            message = f"Invalid cursor: '{cursor}'."
+            raise CoursesInvalidError(message) from exception
+
+    @staticmethod
+    def __serialize(entity: CourseEntity) -> dict[str, Any]:
+        serialized = asdict(entity)
+
+        # Milliseconds, not a part of the entity.
+        serialized["updated"] = int(datetime.now(tz=timezone.utc).timestamp() * 1000)
+
+        return serialized
+
+    @staticmethod
+    def __deserialize(document: dict[str, Any], *, trusted: bool) -> CourseEntity:
+        if trusted:
+            # Documents written by older versions may be incomplete, validate them.
+            with suppress(KeyError, ValueError):
+                return construct_dataclass(
+                    CourseEntity,
+                    id=document["id"],
+                    moodle=document["moodle"],
+                    full_name=document["full_name"],
+                    short_name=document["short_name"],
+                    year=document["year"],
+                    type=CourseType(document["type"]),
+                    degree=CourseDegree(document["degree"]),
+                )
+
+        return CourseEntity(**document)
+
+    @staticmethod
+    def __deserialize_partial(document: dict[str, Any], *, fields: Collection[str]) -> CourseEntity:
+        # Only requested fields are set, others raise on access.
+        return construct_partial_dataclass(
+            CourseEntity,
+            **{
+                field: _CONVERTERS[field](document[field]) if field in _CONVERTERS else document[field]
+                for field in fields
+            },
+        )
@@ -1,40 +1,121 @@
-from typing import Any
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from aiohttp import ClientSession
 
 from iucom.common.domains.cources.entities import CourseEntity
 from iucom.common.domains.cources.enums import CourseDegree, CourseType
 from iucom.common.domains.cources.errors import CoursesError
+from iucom.common.utils import AsyncLazyObject, iterate_json_array
 
 __all__ = ("CoursesMoodleRepository",)
 
 
-class CoursesMoodleRepository:
-    def __init__(self, iu_sso_client_id: str, u_sso_client_secret: str) -> None:
+class CoursesMoodleRepository(AsyncLazyObject):
+    async def __ainit__(
+        self, iu_sso_client_id: str, u_sso_client_secret: str, *, token_leeway: int = 60, chunk_size: int = 65536
+    ) -> None:
         self.__iu_sso_client_id = iu_sso_client_id
         self.__iu_sso_client_secret = u_sso_client_secret
+        self.__session = ClientSession()
+        self.__chunk_size = chunk_size
+        # Refresh the token a bit before it actually expires.
+        self.__token_leeway = token_leeway
+        self.__token: str | None = None
+        self.__token_expires_at = 0.0
+        self.__token_lock = asyncio.Lock()
+        # Validators of the last response, for conditional requests.
+        self.__etag: str | None = None
+        self.__last_modified: str | None = None
+
+    @asynccontextmanager
+    async def get_from_moodle(self, *, conditional: bool = True) -> AsyncIterator[AsyncIterator[CourseEntity] | None]:
+        headers = {"Authorization": f"Bearer {await self.__get_token()}"}
+
+        if conditional and self.__etag is not None:
+            headers["If-None-Match"] = self.__etag
+
+        if conditional and self.__last_modified is not None:
+            headers["If-Modified-Since"] = self.__last_modified
+
+        async with self.__session.get(
+            "https://digitalprofile.innopolis.university/api/courses/list", headers=headers
+        ) as response:
+            # Not modified since the last request.
+            if response.status == 304:  # noqa: PLR2004
+                yield None
+                return
 
-    async def get_from_moodle(self) -> list[CourseEntity]:
-        entities = []
-        for course in await self.__get_moodle_data():
-            if course["idnumber"] == "":
-                continue
-
-            match course["type_course"]:
-                case "humanitaric elective":
-                    course["type_course"] = CourseType.HUMANITARIAN_ELECTIVE
-
-                case "technical elective":
-                    course["type_course"] = CourseType.TECHNICAL_ELECTIVE
-
-                case "core":
-                    course["type_course"] = CourseType.CORE
+            # Token was revoked, get a new one next time.
+            if response.status == 401:  # noqa: PLR2004
+                self.__token = None
 
-                case _:
-                    course["type_course"] = CourseType.UNKNOWN
+            if response.status != 200:  # noqa: PLR2004
+                message = f"Invalid response ({response.status}): {await response.text()}"
+                raise CoursesError(message)
 
-            entities.append(
-                CourseEntity(
+            # Courses are parsed while the response is being downloaded.
+            yield self.__parse(response.content.iter_chunked(self.__chunk_size))
+
+            # Remember only after the caller has processed and written the whole list. If its block
+            # fails, e.g. on write, the list is downloaded again next time.
+            self.__etag = response.headers.get("ETag")
+            self.__last_modified = response.headers.get("Last-Modified")
+
+    async def shutdown(self) -> None:
+        await self.__session.close()
+
+    async def __get_token(self) -> str:
+        if self.__token is not None and time.monotonic() < self.__token_expires_at:
+            return self.__token
+
+        # Only one coroutine refreshes the token, others wait for it.
+        async with self.__token_lock:
+            if self.__token is not None and time.monotonic() < self.__token_expires_at:
+                return self.__token
+
+            async with self.__session.post(
+                "https://sso.university.innopolis.ru/adfs/oauth2/token",
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self.__iu_sso_client_id,
+                    "client_secret": self.__iu_sso_client_secret,
+                },
+            ) as response:
+                if response.status != 200:  # noqa: PLR2004
+                    message = f"Invalid response ({response.status}): {await response.text()}"
+                    raise CoursesError(message)
+
+                # Parse response.
+                data = await response.json()
+
+            self.__token = data["access_token"]
+            self.__token_expires_at = time.monotonic() + int(data.get("expires_in", 0)) - self.__token_leeway
+            return self.__token  # type: ignore[return-value]
+
+    @staticmethod
+    async def __parse(chunks: AsyncIterator[bytes]) -> AsyncIterator[CourseEntity]:
+        try:
+            async for course in iterate_json_array(chunks):
+                if course["idnumber"] == "":
+                    continue
+
+                match course["type_course"]:
+                    case "humanitaric elective":
+                        course["type_course"] = CourseType.HUMANITARIAN_ELECTIVE
+
+                    case "technical elective":
+                        course["type_course"] = CourseType.TECHNICAL_ELECTIVE
+
+                    case "core":
+                        course["type_course"] = CourseType.CORE
+
+                    case _:
+                        course["type_course"] = CourseType.UNKNOWN
+
+                yield CourseEntity(
                     id=course["idnumber"].upper().strip(),
                     moodle=course["moodle_id"],
                     type=course["type_course"] if course["type_course"] is not None else CourseType.UNKNOWN,
@@ -43,32 +124,7 @@ class CoursesMoodleRepository:
                     short_name=course["short_name"].strip(),
                     full_name=course["full_name"].strip(),
                 )
-            )
-
-        return entities
-
-    async def __get_moodle_data(self) -> list[dict[str, Any]]:
-        async with ClientSession() as session, session.post(
-            "https://sso.university.innopolis.ru/adfs/oauth2/token",
-            data={
-                "grant_type": "client_credentials",
-                "client_id": self.__iu_sso_client_id,
-                "client_secret": self.__iu_sso_client_secret,
-            },
-        ) as response:
-            if response.status != 200:  # noqa: PLR2004
-                message = f"Invalid response ({response.status}): {await response.text()}"
-                raise CoursesError(message)
-
-            # Parse response.
-            data = await response.json()
-
-        async with ClientSession() as session, session.get(
-            "https://digitalprofile.innopolis.university/api/courses/list",
-            headers={"Authorization": f"Bearer {data['access_token']}"},
-        ) as response:
-            if response.status != 200:  # noqa: PLR2004
-                message = f"Invalid response ({response.status}): {await response.text()}"
-                raise CoursesError(message)
 
-            return await response.json()
+        except ValueError as exception:
+            message = f"Invalid course list: {exception}"
+            raise CoursesError(message) from exception
@@ -1,44 +1,715 @@
-from dataclasses import asdict
-from typing import Any
+import asyncio
+from asyncio import Queue
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import Any, Sequence
+from uuid import UUID
 
-from pymongo import ASCENDING, IndexModel
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid
 
 from iucom.common.data.storages.mongodb import MongoDBStorage
-from iucom.common.domains.statistics.entities import StatisticsEntryEntity
+from iucom.common.domains.statistics.entities import (
+    ChatActivityEntity,
+    MessagesBucketEntity,
+    StatisticsEntryEntity,
+    StatisticsFeaturesEntity,
+    UserActivityEntity,
+)
+from iucom.common.domains.statistics.enums import StatisticsUnit
+from iucom.common.domains.statistics.errors import StatisticsError
 from iucom.common.utils import AsyncLazyObject
 
 __all__ = ("StatisticsRepository",)
 
+# Keys of chats, users and hours rollups.
+_ROLLUP_KEYS = (("chat",), ("chat", "user"), ("chat", "hour"))
+
 
 class StatisticsRepository(AsyncLazyObject):
-    async def __ainit__(self, storage: MongoDBStorage, *, collection: str = "statistics") -> None:
+    async def __ainit__(
+        self,
+        storage: MongoDBStorage,
+        *,
+        collection: str = "statistics",
+        batch_size: int = 500,
+        flush_period: float = 1.0,
+        queue_size: int = 10000,
+        time_series: bool = False,
+        retention: int | None = None,
+        read_only: bool = False,
+    ) -> None:
         self.__storage = storage
         self.__collection = storage.client[collection]
+        # Counters, that are updated on every write, so reports do not need to scan raw entries.
+        self.__chats_collection = storage.client[f"{collection}_chats"]
+        self.__users_collection = storage.client[f"{collection}_users"]
+        self.__hours_collection = storage.client[f"{collection}_hours"]
+        # Reports only, they may be slightly stale.
+        self.__read_collection = storage.get_read_collection(collection)
+        self.__read_chats_collection = storage.get_read_collection(f"{collection}_chats")
+        self.__read_users_collection = storage.get_read_collection(f"{collection}_users")
+        self.__read_hours_collection = storage.get_read_collection(f"{collection}_hours")
+        self.__batch_size = batch_size
+        self.__flush_period = flush_period
+        self.__time_series = time_series
+        # In time series collection chat and user are stored as metadata.
+        self.__chat_field = "meta.chat" if time_series else "chat"
+        self.__user_field = "meta.user" if time_series else "user"
+        # None is used as a stop signal for the writer.
+        self.__queue: Queue[StatisticsEntryEntity | None] = Queue(maxsize=queue_size)
+        # Counters of written entries, that are not added to rollups yet, see `_ROLLUP_KEYS`.
+        self.__pending_rollups: tuple[dict[tuple[Any, ...], list[Any]], ...] = ({}, {}, {})
+        self.__writer: asyncio.Task[None] | None = None
+        self.__logger = getLogger(f"iucom.{self.__class__.__name__}")
+
+        options = await self.__get_options(storage.client, collection)
+
+        if options is not None and ("timeseries" in options) != time_series:
+            message = f"Collection '{collection}' has a different layout, migrate it first."
+            raise StatisticsError(message)
+
+        # Released in `shutdown`, after the writer has flushed everything.
+        storage.acquire()
+
+        # Readers, e.g. API workers, leave collections and indexes to the writer.
+        if read_only:
+            return
+
+        if time_series:
+            await self.__setup_time_series(storage.client, collection, retention, is_created=options is not None)
+
+        else:
+            await self.__setup_regular(storage.client, collection, retention)
+
+        await self.__setup_rollups(storage.client, collection)
+
+        self.__writer = asyncio.create_task(self.__write_forever())
+
+    async def insert(self, entity: StatisticsEntryEntity) -> None:
+        if self.__writer is None:
+            message = "Cannot write statistics, repository is read only."
+            raise StatisticsError(message)
+
+        # Waits if the queue is full, so producers are slowed down instead of exhausting memory.
+        await self.__queue.put(entity)
+
+    async def insert_many(self, entities: Sequence[StatisticsEntryEntity]) -> None:
+        if self.__writer is None:
+            message = "Cannot write statistics, repository is read only."
+            raise StatisticsError(message)
+
+        if len(entities) == 0:
+            return
+
+        try:
+            await self.__collection.insert_many(
+                [self.__serialize(entity, time_series=self.__time_series) for entity in entities], ordered=False
+            )
+
+        # Other entries are inserted anyway, since write is unordered, so they are counted.
+        except BulkWriteError as exception:
+            failed = {error["index"] for error in exception.details["writeErrors"]}
+            self.__count_rollups([entity for index, entity in enumerate(entities) if index not in failed])
+            await self.__flush_rollups()
+
+            message = f"Cannot write {len(failed)} of {len(entities)} statistics entries."
+            raise StatisticsError(message) from exception
+
+        self.__count_rollups(entities)
+        await self.__flush_rollups()
+
+    async def get_chats_activity(
+        self, chats: Sequence[UUID] | None = None, *, since: datetime | None = None, until: datetime | None = None
+    ) -> list[ChatActivityEntity]:
+        if since is None and until is None:
+            cursor = self.__read_chats_collection.aggregate(
+                [{"$match": self.__build_chats_query(chats)}, {"$sort": {"messages": DESCENDING}}]
+            )
+
+        else:
+            cursor = self.__read_hours_collection.aggregate(
+                [
+                    {"$match": {**self.__build_chats_query(chats), "hour": self.__build_hours_query(since, until)}},
+                    {
+                        "$group": {
+                            "_id": "$chat",
+                            "messages": {"$sum": "$messages"},
+                            "length": {"$sum": "$length"},
+                            "last_message_at": {"$max": "$last_message_at"},
+                        }
+                    },
+                    {"$set": {"chat": "$_id"}},
+                    {"$sort": {"messages": DESCENDING}},
+                ]
+            )
 
-        await self.__collection.create_indexes(
+        return [
+            ChatActivityEntity(
+                chat=document["chat"],
+                messages=document["messages"],
+                length=document["length"],
+                # Stored in UTC.
+                last_message_at=document["last_message_at"].replace(tzinfo=timezone.utc),
+            )
+            async for document in cursor
+        ]
+
+    async def get_top_users(
+        self,
+        chats: Sequence[UUID],
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = 10,
+    ) -> list[UserActivityEntity]:
+        if since is None and until is None:
+            collection = self.__read_users_collection
+            pipeline: list[dict[str, Any]] = [
+                {"$match": self.__build_chats_query(chats)},
+                {"$group": {"_id": "$user", "messages": {"$sum": "$messages"}, "length": {"$sum": "$length"}}},
+            ]
+
+        else:
+            query: dict[str, Any] = {**self.__build_chats_query(chats, field=self.__chat_field), "created_at": {}}
+
+            if since is not None:
+                query["created_at"]["$gte"] = since
+
+            if until is not None:
+                query["created_at"]["$lt"] = until
+
+            collection = self.__read_collection
+            pipeline = [
+                {"$match": query},
+                # Only needed fields. In the regular layout all of them are indexed, so documents are not read.
+                {"$project": {"_id": False, self.__user_field: True, "features.length": True}},
+                {
+                    "$group": {
+                        "_id": f"${self.__user_field}",
+                        "messages": {"$sum": 1},
+                        "length": {"$sum": "$features.length"},
+                    }
+                },
+            ]
+
+        pipeline.extend(({"$sort": {"messages": DESCENDING, "_id": ASCENDING}}, {"$limit": limit}))
+
+        return [
+            UserActivityEntity(user=document["_id"], messages=document["messages"], length=document["length"])
+            async for document in collection.aggregate(pipeline)
+        ]
+
+    async def get_messages_series(
+        self,
+        chats: Sequence[UUID] | None = None,
+        *,
+        unit: StatisticsUnit = StatisticsUnit.DAY,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[MessagesBucketEntity]:
+        query = self.__build_chats_query(chats)
+
+        if since is not None or until is not None:
+            query["hour"] = self.__build_hours_query(since, until)
+
+        cursor = self.__read_hours_collection.aggregate(
             [
-                IndexModel((("id", ASCENDING),), name="statistics_id_idx", unique=True),
-                IndexModel((("user", ASCENDING),), name="statistics_user_idx"),
-                IndexModel((("chat", ASCENDING),), name="statistics_chat_idx"),
+                {"$match": query},
+                {
+                    "$group": {
+                        "_id": {"$dateTrunc": {"date": "$hour", "unit": unit.value, "startOfWeek": "monday"}},
+                        "messages": {"$sum": "$messages"},
+                        "length": {"$sum": "$length"},
+                    }
+                },
+                {"$sort": {"_id": ASCENDING}},
             ]
         )
 
-    async def insert(self, entity: StatisticsEntryEntity) -> None:
-        await self.__collection.insert_one(self.__serialize(entity))
+        return [
+            MessagesBucketEntity(
+                # Stored in UTC.
+                start=document["_id"].replace(tzinfo=timezone.utc),
+                messages=document["messages"],
+                length=document["length"],
+            )
+            async for document in cursor
+        ]
 
     async def shutdown(self) -> None:
+        # Let the writer flush everything, that was queued before.
+        if self.__writer is not None:
+            await self.__queue.put(None)
+            await self.__writer
+
         await self.__storage.shutdown()
 
     @staticmethod
-    def __serialize(entity: StatisticsEntryEntity) -> dict[str, Any]:
-        serialized = asdict(entity)
+    async def migrate(
+        storage: MongoDBStorage, *, collection: str = "statistics", time_series: bool = False, batch_size: int = 1000
+    ) -> int:
+        """
+        Convert existing statistics to the given layout.
+
+        If the regular collection becomes time series one, it is renamed to `<collection>_legacy`,
+        and all entries are copied to the new collection. The legacy collection is kept, drop it
+        manually. While it exists, running the migration again resumes an interrupted copy.
+        Otherwise, only obsolete fields are removed. Then rollups are rebuilt from all entries, so
+        entries written before rollups existed are counted too. If entries expire, rollups are the
+        only record of expired periods, so they are rebuilt only while they are empty. Statistics
+        should not be written meanwhile.
+
+        Args:
+            storage: MongoDB storage.
+            collection: Name of the collection.
+            time_series: Use time series collection.
+            batch_size: How many entries to copy at once.
+
+        Returns: Number of migrated entries.
+
+        """
+        database = storage.client
+        count = await StatisticsRepository.__migrate_layout(
+            database, collection, time_series=time_series, batch_size=batch_size
+        )
+
+        if await StatisticsRepository.__get_options(database, collection) is None:
+            return count
+
+        # Without retention all entries are kept, so rebuilt rollups are complete.
+        is_complete = not await StatisticsRepository.__has_retention(database, collection)
+
+        if is_complete or await StatisticsRepository.__has_no_rollups(database, collection):
+            await StatisticsRepository.__rebuild_rollups(database, collection, time_series=time_series)
+
+        else:
+            getLogger(f"iucom.{StatisticsRepository.__name__}").warning(
+                "Rollups are not rebuilt, since entries expire and counters of expired periods would be lost."
+            )
+
+        return count
+
+    @staticmethod
+    async def __has_retention(database: AsyncIOMotorDatabase, collection: str) -> bool:
+        # Entries may have expired before the layout was converted too.
+        for name in (collection, f"{collection}_legacy"):
+            options = await StatisticsRepository.__get_options(database, name)
+
+            if options is None:
+                continue
+
+            if "expireAfterSeconds" in options:
+                return True
+
+            if (
+                "timeseries" not in options
+                and "statistics_created_at_ttl_idx" in await database[name].index_information()
+            ):
+                return True
+
+        return False
+
+    @staticmethod
+    async def __has_no_rollups(database: AsyncIOMotorDatabase, collection: str) -> bool:
+        for name in ("chats", "users", "hours"):
+            if await database[f"{collection}_{name}"].find_one({}, {"_id": True}) is not None:
+                return False
+
+        return True
+
+    @staticmethod
+    async def __migrate_layout(
+        database: AsyncIOMotorDatabase, collection: str, *, time_series: bool, batch_size: int
+    ) -> int:
+        legacy_collection = f"{collection}_legacy"
+        options = await StatisticsRepository.__get_options(database, collection)
+        has_legacy = await StatisticsRepository.__get_options(database, legacy_collection) is not None
+
+        # Interrupted right after the rename.
+        if options is None and time_series and has_legacy:
+            await StatisticsRepository.__setup_time_series(database, collection, None, is_created=False)
+            options = {"timeseries": {}}
+
+        if options is None:
+            return 0
+
+        if ("timeseries" in options) == time_series:
+            # Time series collection is created without obsolete fields, only resume the copy.
+            if time_series:
+                if not has_legacy:
+                    return 0
+
+                return await StatisticsRepository.__copy_to_time_series(
+                    database, legacy_collection, collection, batch_size=batch_size
+                )
+
+            result = await database[collection].update_many(
+                {"updated": {"$exists": True}}, {"$unset": {"updated": True}}
+            )
+            return result.modified_count
+
+        if not time_series:
+            message = f"Time series collection '{collection}' cannot be converted back."
+            raise StatisticsError(message)
+
+        if has_legacy:
+            message = f"Collection '{legacy_collection}' already exists, drop or rename it first."
+            raise StatisticsError(message)
+
+        # Time series collections cannot be renamed, so the old one is moved out of the way.
+        await database[collection].rename(legacy_collection)
+        await StatisticsRepository.__setup_time_series(database, collection, None, is_created=False)
+
+        return await StatisticsRepository.__copy_to_time_series(
+            database, legacy_collection, collection, batch_size=batch_size
+        )
+
+    @staticmethod
+    async def __copy_to_time_series(
+        database: AsyncIOMotorDatabase, source: str, target: str, *, batch_size: int
+    ) -> int:
+        # Entries keep their ids and are copied in order of them, with ordered inserts, so copied
+        # entries are always a prefix. Entries written after the migration have greater ids.
+        query: dict[str, Any] = {}
+
+        async for last in database[source].find({}, {"_id": True}, sort=[("_id", DESCENDING)], limit=1):
+            async for copied in database[target].find(
+                {"_id": {"$lte": last["_id"]}}, {"_id": True}, sort=[("_id", DESCENDING)], limit=1
+            ):
+                query = {"_id": {"$gt": copied["_id"]}}
+
+        count = 0
+        batch = []
+
+        async for document in database[source].find(query, sort=[("_id", ASCENDING)], batch_size=batch_size):
+            entry = StatisticsRepository.__serialize(StatisticsRepository.__deserialize(document), time_series=True)
+            entry["_id"] = document["_id"]
+            batch.append(entry)
+
+            if len(batch) == batch_size:
+                await database[target].insert_many(batch)
+                count += len(batch)
+                batch = []
+
+        if len(batch) > 0:
+            await database[target].insert_many(batch)
+            count += len(batch)
+
+        return count
+
+    @staticmethod
+    async def __rebuild_rollups(database: AsyncIOMotorDatabase, collection: str, *, time_series: bool) -> None:
+        chat_field = "$meta.chat" if time_series else "$chat"
+        user_field = "$meta.user" if time_series else "$user"
+        counters = {
+            "messages": {"$sum": 1},
+            "length": {"$sum": "$features.length"},
+            "last_message_at": {"$max": "$created_at"},
+        }
+
+        # Indexes of the existing collections are kept by `$out`.
+        await StatisticsRepository.__setup_rollups(database, collection)
+
+        keys: list[tuple[str, dict[str, Any]]] = [
+            (f"{collection}_chats", {"chat": chat_field}),
+            (f"{collection}_users", {"chat": chat_field, "user": user_field}),
+            (
+                f"{collection}_hours",
+                {"chat": chat_field, "hour": {"$dateTrunc": {"date": "$created_at", "unit": "hour"}}},
+            ),
+        ]
+
+        for target, key in keys:
+            # Replaces the whole collection at once, readers never see partial counters.
+            async for _ in database[collection].aggregate(
+                [
+                    {"$group": {"_id": key, **counters}},
+                    {"$set": {field: f"$_id.{field}" for field in key}},
+                    {"$unset": "_id"},
+                    {"$out": target},
+                ],
+                allowDiskUse=True,
+            ):
+                pass
+
+    @staticmethod
+    async def __setup_rollups(database: AsyncIOMotorDatabase, collection: str) -> None:
+        await database[f"{collection}_chats"].create_indexes(
+            [IndexModel((("chat", ASCENDING),), name="statistics_chats_chat_idx", unique=True)]
+        )
+        await database[f"{collection}_users"].create_indexes(
+            [IndexModel((("chat", ASCENDING), ("user", ASCENDING)), name="statistics_users_chat_user_idx", unique=True)]
+        )
+        await database[f"{collection}_hours"].create_indexes(
+            [IndexModel((("chat", ASCENDING), ("hour", ASCENDING)), name="statistics_hours_chat_hour_idx", unique=True)]
+        )
+
+    @staticmethod
+    async def __get_options(database: AsyncIOMotorDatabase, collection: str) -> dict[str, Any] | None:
+        async for info in await database.list_collections(filter={"name": collection}):
+            return info.get("options", {})
+
+        return None
+
+    @staticmethod
+    async def __setup_time_series(
+        database: AsyncIOMotorDatabase, collection: str, retention: int | None, *, is_created: bool
+    ) -> None:
+        if not is_created:
+            options: dict[str, Any] = {
+                # Series are per chat and user, and they are sparse, so hours are the best fit.
+                "timeseries": {"timeField": "created_at", "metaField": "meta", "granularity": "hours"}
+            }
+
+            if retention is not None:
+                options["expireAfterSeconds"] = retention
+
+            try:
+                await database.create_collection(collection, **options)
+
+            # Created meanwhile, e.g. by another worker.
+            except CollectionInvalid:
+                is_created = True
+
+        if is_created:
+            await database.command(
+                "collMod", collection, expireAfterSeconds=retention if retention is not None else "off"
+            )
+
+        await database[collection].create_indexes(
+            [
+                IndexModel((("meta.user", ASCENDING),), name="statistics_meta_user_idx"),
+                IndexModel(
+                    (("meta.chat", ASCENDING), ("created_at", ASCENDING)), name="statistics_meta_chat_created_at_idx"
+                ),
+            ]
+        )
+
+    @staticmethod
+    async def __setup_regular(database: AsyncIOMotorDatabase, collection: str, retention: int | None) -> None:
+        await database[collection].create_indexes(
+            [
+                IndexModel((("id", ASCENDING),), name="statistics_id_idx", unique=True),
+                IndexModel((("user", ASCENDING),), name="statistics_user_idx"),
+                # Covers range queries over chats, e.g. top users for the period.
+                IndexModel(
+                    (
+                        ("chat", ASCENDING),
+                        ("created_at", ASCENDING),
+                        ("user", ASCENDING),
+                        ("features.length", ASCENDING),
+                    ),
+                    name="statistics_chat_created_at_user_length_idx",
+                ),
+            ]
+        )
+
+        indexes = await database[collection].index_information()
+        ttl_index = indexes.get("statistics_created_at_ttl_idx")
+
+        if retention is None:
+            if ttl_index is not None:
+                await database[collection].drop_index("statistics_created_at_ttl_idx")
+
+        elif ttl_index is None:
+            await database[collection].create_index(
+                (("created_at", ASCENDING),), name="statistics_created_at_ttl_idx", expireAfterSeconds=retention
+            )
+
+        elif ttl_index.get("expireAfterSeconds") != retention:
+            await database.command(
+                "collMod", collection, index={"name": "statistics_created_at_ttl_idx", "expireAfterSeconds": retention}
+            )
+
+    @staticmethod
+    def __serialize(entity: StatisticsEntryEntity, *, time_series: bool) -> dict[str, Any]:
+        serialized: dict[str, Any] = {
+            # UUID.
+            "id": str(entity.id),
+            "features": {"length": entity.features.length},
+            "created_at": entity.created_at,
+        }
 
-        # UUID.
-        serialized["id"] = str(serialized["id"])
-        serialized["user"] = str(serialized["user"])
-        serialized["chat"] = str(serialized["chat"])
+        if time_series:
+            serialized["meta"] = {"chat": str(entity.chat), "user": str(entity.user)}
 
-        # Milliseconds.
-        serialized["updated"] = int(entity.created_at.timestamp() * 1000)
+        else:
+            serialized["chat"] = str(entity.chat)
+            serialized["user"] = str(entity.user)
 
         return serialized
+
+    @staticmethod
+    def __deserialize(document: dict[str, Any]) -> StatisticsEntryEntity:
+        # Either of layouts.
+        meta = document.get("meta", document)
+
+        return StatisticsEntryEntity(
+            id=UUID(document["id"]),
+            chat=UUID(meta["chat"]),
+            user=UUID(meta["user"]),
+            features=StatisticsFeaturesEntity(length=document["features"]["length"]),
+            # Stored in UTC.
+            created_at=document["created_at"].replace(tzinfo=timezone.utc),
+        )
+
+    @staticmethod
+    def __build_chats_query(chats: Sequence[UUID] | None, *, field: str = "chat") -> dict[str, Any]:
+        if chats is None:
+            return {}
+
+        return {field: {"$in": [str(chat) for chat in chats]}}
+
+    @staticmethod
+    def __build_hours_query(since: datetime | None, until: datetime | None) -> dict[str, Any]:
+        # Rollups are hourly, so the range is extended to the whole hours.
+        query = {}
+
+        if since is not None:
+            query["$gte"] = since.replace(minute=0, second=0, microsecond=0)
+
+        if until is not None:
+            query["$lt"] = until
+
+        return query
+
+    def __count_rollups(self, entities: Sequence[StatisticsEntryEntity]) -> None:
+        # Key -> [messages, length, last message]. Aggregate in memory first, so there is only one
+        # update per document for the whole batch.
+        chats, users, hours = self.__pending_rollups
+
+        for entity in entities:
+            chat = str(entity.chat)
+            counter = [1, entity.features.length, entity.created_at]
+
+            self.__merge(chats, (chat,), counter)
+            self.__merge(users, (chat, str(entity.user)), counter)
+            self.__merge(hours, (chat, entity.created_at.replace(minute=0, second=0, microsecond=0)), counter)
+
+    async def __flush_rollups(self) -> None:
+        # Taken out, so counters of entries, that are written meanwhile, are kept.
+        pending, self.__pending_rollups = self.__pending_rollups, ({}, {}, {})
+
+        failed = await asyncio.gather(
+            *(
+                self.__write_rollups(collection, fields, counters)
+                for collection, fields, counters in zip(
+                    (self.__chats_collection, self.__users_collection, self.__hours_collection),
+                    _ROLLUP_KEYS,
+                    pending,
+                    strict=True,
+                )
+            )
+        )
+
+        # Retried with the next batch, or after the flush period, see `__write_forever`.
+        for counters, items in zip(self.__pending_rollups, failed, strict=True):
+            for key, counter in items:
+                self.__merge(counters, key, counter)
+
+    async def __write_rollups(
+        self, collection: AsyncIOMotorCollection, fields: tuple[str, ...], counters: dict[tuple[Any, ...], list[Any]]
+    ) -> list[tuple[tuple[Any, ...], list[Any]]]:
+        items = list(counters.items())
+
+        if len(items) == 0:
+            return []
+
+        try:
+            await collection.bulk_write(
+                [self.__build_rollup_update(dict(zip(fields, key, strict=True)), counter) for key, counter in items],
+                ordered=False,
+            )
+
+        # Other updates are applied anyway, since write is unordered.
+        except BulkWriteError as exception:
+            self.__logger.warning(f"Cannot update {collection.name}, retrying later: {exception}.")
+            return [items[error["index"]] for error in exception.details["writeErrors"]]
+
+        # It is unknown, which updates are applied. Driver has retried the write already, so most
+        # likely none of them, and they are retried too.
+        except Exception as exception:
+            self.__logger.warning(f"Cannot update {collection.name}, retrying later: {exception}.")
+            return items
+
+        return []
+
+    @staticmethod
+    def __merge(counters: dict[tuple[Any, ...], list[Any]], key: tuple[Any, ...], counter: list[Any]) -> None:
+        current = counters.get(key)
+
+        if current is None:
+            counters[key] = list(counter)
+            return
+
+        current[0] += counter[0]
+        current[1] += counter[1]
+        current[2] = max(current[2], counter[2])
+
+    @staticmethod
+    def __build_rollup_update(key: dict[str, Any], counter: list[Any]) -> UpdateOne:
+        messages, length, last_message_at = counter
+        return UpdateOne(
+            key,
+            {"$inc": {"messages": messages, "length": length}, "$max": {"last_message_at": last_message_at}},
+            upsert=True,
+        )
+
+    async def __wait_for_entry(self) -> StatisticsEntryEntity | None:
+        # Failed rollup updates are retried, even if there are no new entries.
+        while any(self.__pending_rollups):
+            try:
+                return await asyncio.wait_for(self.__queue.get(), self.__flush_period)
+
+            except asyncio.TimeoutError:
+                await self.__flush_rollups()
+
+        return await self.__queue.get()
+
+    async def __write_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        is_stopped = False
+
+        while not is_stopped:
+            entity = await self.__wait_for_entry()
+
+            if entity is None:
+                break
+
+            batch = [entity]
+            deadline = loop.time() + self.__flush_period
+
+            # Collect a batch until it is full or the time is up.
+            while len(batch) < self.__batch_size:
+                if self.__queue.empty():
+                    timeout = deadline - loop.time()
+
+                    if timeout <= 0:
+                        break
+
+                    try:
+                        entity = await asyncio.wait_for(self.__queue.get(), timeout)
+
+                    except asyncio.TimeoutError:
+                        break
+
+                else:
+                    entity = self.__queue.get_nowait()
+
+                if entity is None:
+                    is_stopped = True
+                    break
+
+                batch.append(entity)
+
+            try:
+                await self.insert_many(batch)
+
+            except Exception as exception:
+                self.__logger.exception(f"Cannot write {len(batch)} statistics entries: {exception}.")
+
+        # The last attempt for failed rollup updates.
+        if any(self.__pending_rollups):
+            await self.__flush_rollups()
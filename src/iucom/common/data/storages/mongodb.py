@@ -1,4 +1,13 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
+import os
+import time
+from logging import getLogger
+from threading import Lock
+from typing import Any, Literal
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import monitoring
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 
 from iucom.common.utils import AsyncLazyObject
 
@@ -6,12 +15,208 @@ __all__ = ("MongoDBStorage",)
 
 
 class MongoDBStorage(AsyncLazyObject):
-    async def __ainit__(self, mongo_url: str, *, db: str = "iucom") -> None:
-        self.__client = AsyncIOMotorClient(mongo_url)[db]
+    async def __ainit__(
+        self,
+        mongo_url: str,
+        *,
+        db: str = "iucom",
+        max_pool_size: int = 100,
+        min_pool_size: int = 0,
+        max_idle_time: float | None = None,
+        connect_timeout: float = 20.0,
+        server_selection_timeout: float = 30.0,
+        socket_timeout: float | None = None,
+        compressors: str | None = None,
+        read_preference: Literal[
+            "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+        ] = "primary",
+        drain_timeout: float = 10.0,
+    ) -> None:
+        self.__max_pool_size = max_pool_size
+        self.__pool_listener = _PoolListener()
+        self.__command_listener = _CommandListener()
+        # The owner, that created the storage. Repositories add their own references, see `acquire`.
+        self.__references = 1
+        self.__drain_timeout = drain_timeout
+        # Only for reads, that may be stale, see `get_read_collection`.
+        self.__read_preference = make_read_preference(read_pref_mode_from_name(read_preference), None)
+        self.__logger = getLogger(f"iucom.{self.__class__.__name__}")
+
+        options: dict[str, Any] = {
+            "maxPoolSize": max_pool_size,
+            "minPoolSize": min_pool_size,
+            "connectTimeoutMS": int(connect_timeout * 1000),
+            "serverSelectionTimeoutMS": int(server_selection_timeout * 1000),
+        }
+
+        if max_idle_time is not None:
+            options["maxIdleTimeMS"] = int(max_idle_time * 1000)
+
+        if socket_timeout is not None:
+            options["socketTimeoutMS"] = int(socket_timeout * 1000)
+
+        # Comma separated, e.g. "zstd,zlib". Server picks the first one it supports.
+        if compressors is not None:
+            options["compressors"] = compressors
+
+        self.__client: AsyncIOMotorDatabase = AsyncIOMotorClient(
+            mongo_url, event_listeners=[self.__pool_listener, self.__command_listener], **options
+        )[db]
 
     @property
     def client(self) -> AsyncIOMotorDatabase:
         return self.__client
 
+    def get_read_collection(self, collection: str) -> AsyncIOMotorCollection:
+        # Other operations use the primary, so read-modify-write paths see their own writes, and
+        # pages are never older than versions, that are sent as ETags.
+        return self.__client[collection].with_options(read_preference=self.__read_preference)  # type: ignore[arg-type]
+
+    def acquire(self) -> None:
+        # Each user of the storage calls `shutdown` once, the client is closed after the last one.
+        self.__references += 1
+
+    def get_pool_metrics(self) -> dict[str, int]:
+        # Connections of this process only, each worker has its own client.
+        return {"pid": os.getpid(), "max_size": self.__max_pool_size, **self.__pool_listener.get_metrics()}
+
     async def shutdown(self) -> None:
+        self.__references -= 1
+
+        # Still used, or already closed.
+        if self.__references != 0:
+            return
+
+        # Let started operations finish, so they are not killed by closing the pool.
+        deadline = time.monotonic() + self.__drain_timeout
+        while self.__command_listener.get_in_flight() + self.__pool_listener.get_waiting() > 0:
+            if time.monotonic() >= deadline:
+                self.__logger.warning(
+                    f"Closing with {self.__command_listener.get_in_flight()} commands in flight, "
+                    f"drain timeout {self.__drain_timeout}s exceeded."
+                )
+                break
+
+            await asyncio.sleep(0.01)
+
         self.__client.client.close()
+
+
+class _PoolListener(monitoring.ConnectionPoolListener):
+    """Counts connections of all pools of a client.
+
+    Events come from threads of the driver, so counters are guarded by a lock.
+    """
+
+    def __init__(self) -> None:
+        """Create a listener."""
+        self.__lock = Lock()
+        self.__open = 0
+        self.__in_use = 0
+        self.__created = 0
+        self.__checkouts = 0
+        self.__checkout_failures = 0
+        # Operations, that wait for a connection.
+        self.__waiting = 0
+
+    def get_metrics(self) -> dict[str, int]:
+        """
+        Get current counters.
+
+        Returns: Open, in use and idle connections, and totals since the start.
+
+        """
+        with self.__lock:
+            return {
+                "open": self.__open,
+                "in_use": self.__in_use,
+                "idle": self.__open - self.__in_use,
+                "created": self.__created,
+                "checkouts": self.__checkouts,
+                "checkout_failures": self.__checkout_failures,
+                "waiting": self.__waiting,
+            }
+
+    def get_waiting(self) -> int:
+        """
+        Get number of operations, that wait for a connection.
+
+        Returns: The number.
+
+        """
+        with self.__lock:
+            return self.__waiting
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__open += 1
+            self.__created += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__open -= 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__in_use += 1
+            self.__checkouts += 1
+            self.__waiting -= 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__in_use -= 1
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__checkout_failures += 1
+            self.__waiting -= 1
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__waiting += 1
+
+
+class _CommandListener(monitoring.CommandListener):
+    """Counts commands, that are sent, but not answered yet."""
+
+    def __init__(self) -> None:
+        """Create a listener."""
+        self.__lock = Lock()
+        self.__in_flight = 0
+
+    def get_in_flight(self) -> int:
+        """
+        Get number of commands in flight.
+
+        Returns: The number.
+
+        """
+        with self.__lock:
+            return self.__in_flight
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__in_flight += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__in_flight -= 1
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:  # noqa: ARG002
+        with self.__lock:
+            self.__in_flight -= 1
@@ -1,4 +1,11 @@
-__all__ = ("ChatsError", "ChatsNotFoundError", "ChatsModifiedError", "ChatsCannotModifyError", "ChatsInvalidError")
+__all__ = (
+    "ChatsError",
+    "ChatsNotFoundError",
+    "ChatsModifiedError",
+    "ChatsCannotModifyError",
+    "ChatsInvalidError",
+    "ChatsNotSupportedError",
+)
 
 
 class ChatsError(Exception):
@@ -19,3 +26,7 @@ class ChatsModifiedError(ChatsError):
 
 class ChatsCannotModifyError(ChatsError):
     pass
+
+
+class ChatsNotSupportedError(ChatsError):
+    pass
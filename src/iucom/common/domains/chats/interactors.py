@@ -1,20 +1,41 @@
 import dataclasses
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import AsyncContextManager, AsyncIterator
+from pathlib import Path
+from typing import Any, AsyncContextManager, AsyncIterator, Collection, Iterable
 from uuid import UUID
 
 from iucom.common.data.repositories.chats import ChatsRepository
 from iucom.common.domains.chats.entities import ChatEntity, ChatUpdateEntity
 from iucom.common.domains.chats.enums import ChatStatus, ChatType, SlowMode
-from iucom.common.domains.chats.errors import ChatsCannotModifyError, ChatsInvalidError, ChatsNotFoundError
+from iucom.common.domains.chats.errors import (
+    ChatsCannotModifyError,
+    ChatsError,
+    ChatsInvalidError,
+    ChatsNotFoundError,
+)
+from iucom.common.utils import TTLCache
 
 __all__ = ("ChatsInteractor",)
 
 
 class ChatsInteractor:
-    def __init__(self, repository: ChatsRepository) -> None:
+    def __init__(
+        self,
+        repository: ChatsRepository,
+        *,
+        cache_ttl: float = 0,
+        cache_size: int = 256,
+        cache_path: Path | None = None,
+    ) -> None:
         self.__repository = repository
+        # Bounded pages of chats, disabled by default: the sync should never see stale data.
+        self.__cache: TTLCache[tuple[Any, ...], list[ChatEntity]] | None = (
+            TTLCache(cache_ttl, max_size=cache_size, shared_path=cache_path) if cache_ttl > 0 else None
+        )
+        self.__versions_cache: TTLCache[str | None, tuple[int, datetime | None]] | None = (
+            TTLCache(cache_ttl, max_size=cache_size, shared_path=cache_path) if cache_ttl > 0 else None
+        )
 
     async def get(self, *, id_: UUID | None = None, telegram_entity: int | None = None) -> ChatEntity:
         entity = await self.__repository.get(id_=id_, telegram_entity=telegram_entity)
@@ -26,33 +47,103 @@ class ChatsInteractor:
         return entity
 
     def filter(  # noqa: A003
-        self, *, exclude_synced: bool = False, course: str | None = None
+        self,
+        *,
+        exclude_synced: bool = False,
+        course: str | None = None,
+        ids: Collection[UUID] | None = None,
+        limit: int | None = None,
+        after: str | None = None,
+        fields: Collection[str] | None = None,
+        cached: bool = True,
     ) -> AsyncIterator[ChatEntity]:
-        return self.__repository.filter(exclude_synced=exclude_synced, course=course)
+        # Only bounded pages are cached, streams should not be read into memory.
+        if self.__cache is None or not cached or limit is None:
+            return self.__repository.filter(
+                exclude_synced=exclude_synced, course=course, ids=ids, limit=limit, after=after, fields=fields
+            )
+
+        key = (
+            exclude_synced,
+            course,
+            None if ids is None else frozenset(ids),
+            limit,
+            after,
+            None if fields is None else frozenset(fields),
+        )
+        return self.__filter_cached(self.__cache, key)
+
+    async def get_version(self, *, course: str | None = None) -> tuple[int, datetime | None]:
+        if self.__versions_cache is None:
+            return await self.__repository.get_version(course=course)
+
+        version = self.__versions_cache.get(course)
+
+        if version is None:
+            generation = self.__versions_cache.get_generation()
+            version = await self.__repository.get_version(course=course)
+            self.__versions_cache.set(course, version, generation=generation)
+
+        return version
+
+    def get_cursor(self, entity: ChatEntity) -> str:
+        return self.__repository.get_cursor(entity)
+
+    def validate_cursor(self, cursor: str) -> None:
+        self.__repository.decode_cursor(cursor)
+
+    def watch(self) -> AsyncIterator[tuple[UUID | None, ChatEntity | None]]:
+        return self.__repository.watch()
 
     async def create(self, entity: ChatEntity) -> None:
-        if entity.type == ChatType.CHANNEL and entity.slow_mode != SlowMode.DISABLED:
-            message = "Channel cannot have slow mode."
-            raise ChatsInvalidError(message)
+        self.__prepare(entity)
 
-        # Indicate, that we have created it. Just in case.
-        entity.status = ChatStatus.CREATING
-        entity.updated = datetime.now(tz=timezone.utc)
+        try:
+            await self.__repository.insert(entity)
+
+        finally:
+            self.__invalidate()
+
+    async def create_many(self, entities: Iterable[ChatEntity], *, batch_size: int = 1000) -> dict[int, ChatsError]:
+        # Position of the entity -> why it was not created.
+        errors: dict[int, ChatsError] = {}
+        batch: list[tuple[int, ChatEntity]] = []
 
-        await self.__repository.insert(entity)
+        for i, entity in enumerate(entities):
+            try:
+                self.__prepare(entity)
+
+            except ChatsInvalidError as exception:
+                errors[i] = exception
+                continue
+
+            batch.append((i, entity))
+
+            if len(batch) >= batch_size:
+                errors.update(await self.__insert_batch(batch))
+                batch = []
+
+        errors.update(await self.__insert_batch(batch))
+        self.__invalidate()
+        return errors
 
     async def delete(self, id_: UUID, *, forced: bool = False) -> None:
         if forced:
             # Deleted.
             if await self.__repository.delete(id_):
+                self.__invalidate()
                 return
 
             message = f"Cannot find a chat with id '{id_}'."
             raise ChatsNotFoundError(message)
 
-        async with self.__repository.update(id_) as entity:
-            entity.status = ChatStatus.DELETING
-            entity.updated = datetime.now(tz=timezone.utc)
+        try:
+            async with self.__repository.update(id_) as entity:
+                entity.status = ChatStatus.DELETING
+                entity.updated = datetime.now(tz=timezone.utc)
+
+        finally:
+            self.__invalidate()
 
     async def update(self, new_entity: ChatUpdateEntity) -> ChatEntity:
         async with self.__update(self.__repository.update(new_entity.id)) as old_entity:
@@ -69,17 +160,75 @@ class ChatsInteractor:
         return old_entity
 
     async def update_by_filter(
-        self, *, exclude_synced: bool = False, course: str | None = None
+        self, *, exclude_synced: bool = False, course: str | None = None, ids: Collection[UUID] | None = None
     ) -> AsyncIterator[AsyncContextManager[ChatEntity]]:
-        async for transaction in self.__repository.update_by_filter(exclude_synced=exclude_synced, course=course):
+        async for transaction in self.__repository.update_by_filter(
+            exclude_synced=exclude_synced, course=course, ids=ids
+        ):
             yield self.__update(transaction)
 
     async def shutdown(self) -> None:
         await self.__repository.shutdown()
 
+    async def __filter_cached(
+        self, cache: TTLCache[tuple[Any, ...], list[ChatEntity]], key: tuple[Any, ...]
+    ) -> AsyncIterator[ChatEntity]:
+        exclude_synced, course, ids, limit, after, fields = key
+        # Pages are bound to the version, that is sent as ETag, so they are never older than it.
+        key = (await self.get_version(course=course), *key)
+        entities = cache.get(key)
+
+        if entities is None:
+            # Writes during the read make it stale, see `set`.
+            generation = cache.get_generation()
+            entities = [
+                entity
+                async for entity in self.__repository.filter(
+                    exclude_synced=exclude_synced, course=course, ids=ids, limit=limit, after=after, fields=fields
+                )
+            ]
+            cache.set(key, entities, generation=generation)
+
+        for entity in entities:
+            yield entity
+
+    def __invalidate(self) -> None:
+        if self.__cache is not None:
+            self.__cache.invalidate()
+
+        # Other processes see the change through the shared file anyway.
+        if self.__versions_cache is not None:
+            self.__versions_cache.clear()
+
+    @staticmethod
+    def __prepare(entity: ChatEntity) -> None:
+        if entity.type == ChatType.CHANNEL and entity.slow_mode != SlowMode.DISABLED:
+            message = "Channel cannot have slow mode."
+            raise ChatsInvalidError(message)
+
+        # Indicate, that we have created it. Just in case.
+        entity.status = ChatStatus.CREATING
+        entity.updated = datetime.now(tz=timezone.utc)
+
+    async def __insert_batch(self, batch: list[tuple[int, ChatEntity]]) -> dict[int, ChatsError]:
+        if len(batch) == 0:
+            return {}
+
+        errors = await self.__repository.insert_many([entity for _, entity in batch], chunk_size=len(batch))
+        return {batch[i][0]: error for i, error in errors.items()}
+
+    @asynccontextmanager
+    async def __update(self, transaction: AsyncContextManager[ChatEntity]) -> AsyncIterator[ChatEntity]:
+        try:
+            async with self.__transaction(transaction) as new_entity:
+                yield new_entity
+
+        finally:
+            self.__invalidate()
+
     @staticmethod
     @asynccontextmanager
-    async def __update(transaction: AsyncContextManager[ChatEntity]) -> AsyncIterator[ChatEntity]:
+    async def __transaction(transaction: AsyncContextManager[ChatEntity]) -> AsyncIterator[ChatEntity]:
         async with transaction as old_entity:
             # Save copy of old status.
             old_status = old_entity.status
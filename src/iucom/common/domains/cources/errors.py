@@ -1,4 +1,4 @@
-__all__ = ("CoursesError", "CoursesRepositoryNotProvidedError", "CoursesNotFoundError")
+__all__ = ("CoursesError", "CoursesRepositoryNotProvidedError", "CoursesNotFoundError", "CoursesInvalidError")
 
 
 class CoursesError(Exception):
@@ -11,3 +11,7 @@ class CoursesRepositoryNotProvidedError(CoursesError):
 
 class CoursesNotFoundError(CoursesError):
     pass
+
+
+class CoursesInvalidError(CoursesError):
+    pass
@@ -1,19 +1,45 @@
+import hashlib
+from dataclasses import asdict
+from datetime import datetime
 from logging import getLogger
-from typing import AsyncIterator
+from pathlib import Path
+from typing import Any, AsyncIterator, Collection, Sequence
+
+import orjson
 
 from iucom.common.data.repositories.cources import CoursesMongoDBRepository, CoursesMoodleRepository
 from iucom.common.domains.cources.entities import CourseEntity
 from iucom.common.domains.cources.errors import CoursesNotFoundError, CoursesRepositoryNotProvidedError
+from iucom.common.utils import TTLCache
 
 __all__ = ("CoursesInteractor",)
 
 
 class CoursesInteractor:
     def __init__(
-        self, mongodb_repository: CoursesMongoDBRepository, moodle_repository: CoursesMoodleRepository | None = None
+        self,
+        mongodb_repository: CoursesMongoDBRepository,
+        moodle_repository: CoursesMoodleRepository | None = None,
+        *,
+        batch_size: int = 500,
+        cache_ttl: float = 0,
+        cache_size: int = 256,
+        cache_path: Path | None = None,
     ) -> None:
         self.__mongodb_repository = mongodb_repository
         self.__moodle_repository = moodle_repository
+        self.__batch_size = batch_size
+        # Course id -> hash of the stored content, to write only changed courses.
+        self.__hashes: dict[str, bytes] | None = None
+        # Version of the collection after the last sync, to notice writes made by others.
+        self.__version: tuple[int, datetime | None] | None = None
+        # Bounded pages of courses, disabled by default: the sync should never see stale data.
+        self.__cache: TTLCache[tuple[Any, ...], list[CourseEntity]] | None = (
+            TTLCache(cache_ttl, max_size=cache_size, shared_path=cache_path) if cache_ttl > 0 else None
+        )
+        self.__versions_cache: TTLCache[None, tuple[int, datetime | None]] | None = (
+            TTLCache(cache_ttl, max_size=1, shared_path=cache_path) if cache_ttl > 0 else None
+        )
         self.__logger = getLogger(f"iucom.{self.__class__.__name__}")
 
     async def get(self, id_: str) -> CourseEntity:
@@ -27,16 +53,54 @@ class CoursesInteractor:
 
     async def upsert(self, entity: CourseEntity) -> None:
         await self.__mongodb_repository.upsert(entity)
+        self.__invalidate()
+
+    async def upsert_many(self, entities: Sequence[CourseEntity]) -> None:
+        await self.__mongodb_repository.upsert_many(entities)
+        self.__invalidate()
 
     async def delete(self, id_: str) -> None:
         if await self.__mongodb_repository.delete(id_):
+            self.__invalidate()
             return
 
         message = f"Cannot find a course with id '{id_}'."
         raise CoursesNotFoundError(message)
 
-    def filter(self) -> AsyncIterator:  # noqa: A003
-        return self.__mongodb_repository.filter()
+    def filter(  # noqa: A003
+        self,
+        *,
+        limit: int | None = None,
+        after: str | None = None,
+        fields: Collection[str] | None = None,
+        cached: bool = True,
+    ) -> AsyncIterator[CourseEntity]:
+        # Only bounded pages are cached, streams should not be read into memory.
+        if self.__cache is None or not cached or limit is None:
+            return self.__mongodb_repository.filter(limit=limit, after=after, fields=fields)
+
+        return self.__filter_cached(
+            self.__cache, limit=limit, after=after, fields=None if fields is None else frozenset(fields)
+        )
+
+    async def get_version(self) -> tuple[int, datetime | None]:
+        if self.__versions_cache is None:
+            return await self.__mongodb_repository.get_version()
+
+        version = self.__versions_cache.get(None)
+
+        if version is None:
+            generation = self.__versions_cache.get_generation()
+            version = await self.__mongodb_repository.get_version()
+            self.__versions_cache.set(None, version, generation=generation)
+
+        return version
+
+    def get_cursor(self, entity: CourseEntity) -> str:
+        return self.__mongodb_repository.get_cursor(entity)
+
+    def validate_cursor(self, cursor: str) -> None:
+        self.__mongodb_repository.decode_cursor(cursor)
 
     async def sync(self) -> None:
         if self.__moodle_repository is None:
@@ -44,12 +108,79 @@ class CoursesInteractor:
             raise CoursesRepositoryNotProvidedError(message)
 
         self.__logger.info("Syncing...")
-        for entity in await self.__moodle_repository.get_from_moodle():
-            self.__logger.info(f"Syncing... Course: {entity}")
-            await self.upsert(entity)
-            self.__logger.info("Synced.")
 
-        self.__logger.info("Synced.")
+        # Start from the stored state, so a restart does not rewrite everything. If courses were
+        # changed or deleted through the API, reseed and download the whole list to restore them.
+        is_changed = self.__version != await self.__mongodb_repository.get_version()
+
+        if self.__hashes is None or is_changed:
+            self.__hashes = {entity.id: self.__hash(entity) async for entity in self.__mongodb_repository.filter()}
+
+        async with self.__moodle_repository.get_from_moodle(conditional=not is_changed) as entities:
+            if entities is None:
+                self.__logger.info("Synced. Not modified.")
+                return
+
+            hashes = {}
+            changed_entities = []
+            changed_count = 0
+            async for entity in entities:
+                hashes[entity.id] = self.__hash(entity)
+
+                if self.__hashes.get(entity.id) != hashes[entity.id]:
+                    changed_entities.append(entity)
+
+                # Write while downloading the rest.
+                if len(changed_entities) >= self.__batch_size:
+                    await self.upsert_many(changed_entities)
+                    changed_count += len(changed_entities)
+                    changed_entities = []
+
+            await self.upsert_many(changed_entities)
+            changed_count += len(changed_entities)
+
+        # Courses removed from Moodle are forgotten, not deleted: they could be imported manually.
+        self.__hashes = hashes
+        self.__version = await self.__mongodb_repository.get_version()
+        self.__logger.info(f"Synced. Changed courses: {changed_count}/{len(hashes)}.")
 
     async def shutdown(self) -> None:
         await self.__mongodb_repository.shutdown()
+
+        if self.__moodle_repository is not None:
+            await self.__moodle_repository.shutdown()
+
+    async def __filter_cached(
+        self,
+        cache: TTLCache[tuple[Any, ...], list[CourseEntity]],
+        *,
+        limit: int | None,
+        after: str | None,
+        fields: frozenset[str] | None,
+    ) -> AsyncIterator[CourseEntity]:
+        # Pages are bound to the version, that is sent as ETag, so they are never older than it.
+        key = (await self.get_version(), limit, after, fields)
+        entities = cache.get(key)
+
+        if entities is None:
+            # Writes during the read make it stale, see `set`.
+            generation = cache.get_generation()
+            entities = [
+                entity async for entity in self.__mongodb_repository.filter(limit=limit, after=after, fields=fields)
+            ]
+            cache.set(key, entities, generation=generation)
+
+        for entity in entities:
+            yield entity
+
+    def __invalidate(self) -> None:
+        if self.__cache is not None:
+            self.__cache.invalidate()
+
+        # Other processes see the change through the shared file anyway.
+        if self.__versions_cache is not None:
+            self.__versions_cache.clear()
+
+    @staticmethod
+    def __hash(entity: CourseEntity) -> bytes:
+        return hashlib.blake2b(orjson.dumps(asdict(entity), option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
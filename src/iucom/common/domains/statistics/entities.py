@@ -1,38 +1,72 @@
+import dataclasses
 from datetime import datetime, timezone
 from uuid import UUID
 
 from pydantic import Field, validator
 from pydantic.dataclasses import dataclass
 
-__all__ = ("MessageEntity", "StatisticsFeaturesEntity", "StatisticsEntryEntity")
+__all__ = (
+    "MessageEntity",
+    "StatisticsFeaturesEntity",
+    "StatisticsEntryEntity",
+    "ChatActivityEntity",
+    "UserActivityEntity",
+    "MessagesBucketEntity",
+)
 
 
-@dataclass
+# Created for every incoming message, so these are plain slotted dataclasses without validation.
+# Values come from the Telegram handler, datetimes are already in UTC.
+
+
+@dataclasses.dataclass(slots=True)
 class MessageEntity:
-    id: UUID = Field()  # noqa: A003
+    id: UUID  # noqa: A003
+    chat: UUID
+    user: UUID
+    body: str
+    created_at: datetime
+
+
+@dataclasses.dataclass(slots=True)
+class StatisticsFeaturesEntity:
+    length: int
+
+
+@dataclasses.dataclass(slots=True)
+class StatisticsEntryEntity:
+    id: UUID  # noqa: A003
+    chat: UUID
+    user: UUID
+    features: StatisticsFeaturesEntity
+    created_at: datetime
+
+
+@dataclass
+class ChatActivityEntity:
     chat: UUID = Field()
-    user: UUID = Field()
-    body: str = Field()
-    created_at: datetime = Field()
+    messages: int = Field()
+    length: int = Field()
+    last_message_at: datetime = Field()
 
-    @validator("created_at", always=True)
-    def __validate_updated_at(cls, value: datetime) -> datetime:
+    @validator("last_message_at", always=True)
+    def __validate_last_message_at(cls, value: datetime) -> datetime:
         return value.astimezone(tz=timezone.utc)
 
 
 @dataclass
-class StatisticsFeaturesEntity:
+class UserActivityEntity:
+    user: UUID = Field()
+    messages: int = Field()
     length: int = Field()
 
 
 @dataclass
-class StatisticsEntryEntity:
-    id: UUID = Field()  # noqa: A003
-    chat: UUID = Field()
-    user: UUID = Field()
-    features: StatisticsFeaturesEntity = Field()
-    created_at: datetime = Field()
+class MessagesBucketEntity:
+    start: datetime = Field()
+    messages: int = Field()
+    length: int = Field()
 
-    @validator("created_at", always=True)
-    def __validate_updated_at(cls, value: datetime) -> datetime:
+    @validator("start", always=True)
+    def __validate_start(cls, value: datetime) -> datetime:
         return value.astimezone(tz=timezone.utc)
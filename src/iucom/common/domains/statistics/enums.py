@@ -0,0 +1,10 @@
+from enum import Enum
+
+__all__ = ("StatisticsUnit",)
+
+
+class StatisticsUnit(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
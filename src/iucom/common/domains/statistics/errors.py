@@ -0,0 +1,13 @@
+__all__ = ("StatisticsError", "StatisticsInteractorNotProvidedError", "StatisticsInvalidError")
+
+
+class StatisticsError(Exception):
+    pass
+
+
+class StatisticsInteractorNotProvidedError(StatisticsError):
+    pass
+
+
+class StatisticsInvalidError(StatisticsError):
+    pass
@@ -1,22 +1,110 @@
-import dataclasses
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
 
 from iucom.common.data.repositories.statistics import StatisticsRepository
-from iucom.common.domains.statistics.entities import MessageEntity, StatisticsEntryEntity, StatisticsFeaturesEntity
+from iucom.common.domains.chats.interactors import ChatsInteractor
+from iucom.common.domains.statistics.entities import (
+    ChatActivityEntity,
+    MessageEntity,
+    MessagesBucketEntity,
+    StatisticsEntryEntity,
+    StatisticsFeaturesEntity,
+    UserActivityEntity,
+)
+from iucom.common.domains.statistics.enums import StatisticsUnit
+from iucom.common.domains.statistics.errors import StatisticsInteractorNotProvidedError, StatisticsInvalidError
+from iucom.common.utils import TTLCache
 
 __all__ = ("StatisticsInteractor",)
 
 
 class StatisticsInteractor:
-    def __init__(self, repository: StatisticsRepository) -> None:
+    def __init__(
+        self,
+        repository: StatisticsRepository,
+        chats_interactor: ChatsInteractor | None = None,
+        *,
+        cache_ttl: float = 60,
+        cache_size: int = 1024,
+    ) -> None:
         self.__repository = repository
+        self.__chats_interactor = chats_interactor
+        # Reports are requested by dashboards again and again, and may be a bit stale.
+        self.__cache: TTLCache[tuple[Any, ...], list[Any]] = TTLCache(cache_ttl, max_size=cache_size)
 
     async def create(self, entity: MessageEntity) -> StatisticsEntryEntity:
         entry = StatisticsEntryEntity(
-            **dataclasses.asdict(entity), features=StatisticsFeaturesEntity(length=len(entity.body))
+            id=entity.id,
+            chat=entity.chat,
+            user=entity.user,
+            features=StatisticsFeaturesEntity(length=len(entity.body)),
+            created_at=entity.created_at,
         )
 
         await self.__repository.insert(entry)
         return entry
 
+    async def get_chats_activity(
+        self, chats: Sequence[UUID] | None = None, *, since: datetime | None = None, until: datetime | None = None
+    ) -> list[ChatActivityEntity]:
+        self.__validate_range(since, until)
+
+        key = ("chats", None if chats is None else frozenset(chats), since, until)
+        result = self.__cache.get(key)
+
+        if result is None:
+            result = await self.__repository.get_chats_activity(chats, since=since, until=until)
+            self.__cache.set(key, result)
+
+        return result
+
+    async def get_top_users(
+        self, course: str, *, since: datetime | None = None, until: datetime | None = None, limit: int = 10
+    ) -> list[UserActivityEntity]:
+        if self.__chats_interactor is None:
+            message = "You should provide ChatsInteractor interactor to get statistics of a course."
+            raise StatisticsInteractorNotProvidedError(message)
+
+        self.__validate_range(since, until)
+
+        key = ("users", course, since, until, limit)
+        result = self.__cache.get(key)
+
+        if result is None:
+            chats = [entity.id async for entity in self.__chats_interactor.filter(course=course)]
+            result = await self.__repository.get_top_users(chats, since=since, until=until, limit=limit)
+            self.__cache.set(key, result)
+
+        return result
+
+    async def get_messages_series(
+        self,
+        chats: Sequence[UUID] | None = None,
+        *,
+        unit: StatisticsUnit = StatisticsUnit.DAY,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[MessagesBucketEntity]:
+        self.__validate_range(since, until)
+
+        key = ("messages", None if chats is None else frozenset(chats), unit, since, until)
+        result = self.__cache.get(key)
+
+        if result is None:
+            result = await self.__repository.get_messages_series(chats, unit=unit, since=since, until=until)
+            self.__cache.set(key, result)
+
+        return result
+
     async def shutdown(self) -> None:
         await self.__repository.shutdown()
+
+        if self.__chats_interactor is not None:
+            await self.__chats_interactor.shutdown()
+
+    @staticmethod
+    def __validate_range(since: datetime | None, until: datetime | None) -> None:
+        if since is not None and until is not None and since >= until:
+            message = f"Start of the period '{since}' should be before its end '{until}'."
+            raise StatisticsInvalidError(message)
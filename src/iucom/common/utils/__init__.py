@@ -1,4 +1,18 @@
 from iucom.common.utils.async_lazy_object import AsyncLazyObject
+from iucom.common.utils.construct import construct_dataclass, construct_partial_dataclass
 from iucom.common.utils.entrypoint import entrypoint
+from iucom.common.utils.json_stream import iterate_json_array
+from iucom.common.utils.rate_limiter import RateLimiter
+from iucom.common.utils.ttl_cache import TTLCache
+from iucom.common.utils.user_hasher import UserHasher
 
-__all__ = ("AsyncLazyObject", "entrypoint")
+__all__ = (
+    "AsyncLazyObject",
+    "construct_dataclass",
+    "construct_partial_dataclass",
+    "entrypoint",
+    "iterate_json_array",
+    "RateLimiter",
+    "TTLCache",
+    "UserHasher",
+)
@@ -0,0 +1,80 @@
+import dataclasses
+from typing import Any, TypeVar
+
+__all__ = ("construct_dataclass", "construct_partial_dataclass")
+
+T = TypeVar("T")
+
+# Pydantic dataclass -> subclass for partial instances.
+_PARTIAL_CLASSES: dict[type, type] = {}
+
+
+class _Unread:
+    # Non-data descriptor, so values of read fields in the instance `__dict__` take precedence.
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.__name = name
+
+    def __get__(self, instance: object, owner: type) -> Any:
+        message = f"Field {self.__name!r} of {owner.__name__} was not read."
+        raise AttributeError(message)
+
+
+def construct_dataclass(cls: type[T], **values: Any) -> T:
+    """Create a pydantic dataclass instance without validation.
+
+    Use it only for already validated data, e.g. documents written by the application itself. All
+    fields should be provided and have proper types, nothing is checked.
+
+    Examples:
+        >>> entity = construct_dataclass(CourseEntity, id="CS101", ...)
+
+    Args:
+        cls: Pydantic dataclass.
+        **values: Values of all fields.
+
+    Returns: Instance of the dataclass.
+
+    """
+    instance = object.__new__(cls)
+    # Mark as initialised, same as after the validation.
+    instance.__dict__.update(values, __pydantic_initialised__=True)
+    return instance
+
+
+def construct_partial_dataclass(cls: type[T], **values: Any) -> T:
+    """Create a pydantic dataclass instance with only some fields and without validation.
+
+    Otherwise pydantic dataclasses return class level `FieldInfo` for missing fields, so access of
+    fields, that were not provided, raises `AttributeError` instead. Same as `construct_dataclass`,
+    nothing is checked.
+
+    Examples:
+        >>> entity = construct_partial_dataclass(CourseEntity, id="CS101")
+        >>> entity.title
+        Traceback (most recent call last):
+        AttributeError: Field 'title' of PartialCourseEntity was not read.
+
+    Args:
+        cls: Pydantic dataclass.
+        **values: Values of some fields.
+
+    Returns: Instance of the dataclass.
+
+    """
+    return construct_dataclass(_get_partial_class(cls), **values)
+
+
+def _get_partial_class(cls: type[T]) -> type[T]:
+    if cls not in _PARTIAL_CLASSES:
+        # Missing fields raise, instead of falling back to class attributes.
+        fields = dataclasses.fields(cls)  # type: ignore[arg-type]
+        namespace: dict[str, Any] = {field.name: _Unread() for field in fields}
+        _PARTIAL_CLASSES[cls] = type(f"Partial{cls.__name__}", (cls,), {**namespace, "__repr__": _repr_partial})
+
+    return _PARTIAL_CLASSES[cls]
+
+
+def _repr_partial(self: Any) -> str:
+    # Only read fields.
+    values = ", ".join(f"{key}={value!r}" for key, value in vars(self).items() if not key.startswith("_"))
+    return f"{type(self).__name__}({values})"
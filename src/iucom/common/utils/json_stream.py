@@ -0,0 +1,134 @@
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+__all__ = ("iterate_json_array",)
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+# Characters, that may continue a number.
+_NUMBER_CHARACTERS = frozenset("0123456789.eE+-")
+# Drop parsed data from the buffer, when it becomes bigger than this.
+_COMPACT_THRESHOLD = 1 << 16
+
+
+async def iterate_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:  # noqa: PLR0912, PLR0915
+    """Parse a top level JSON array incrementally.
+
+    Items are yielded as soon as they are completely received, so the whole array is never kept
+    in memory.
+
+    Examples:
+        >>> async with session.get(url) as response:
+        >>>     async for item in iterate_json_array(response.content.iter_chunked(65536)):
+        >>>         print(item)
+
+    Args:
+        chunks: Raw UTF-8 encoded document.
+
+    Returns: Items of the array.
+
+    Raises:
+        ValueError: If the document is not a valid JSON array.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    iterator = aiter(chunks)
+
+    buffer = ""
+    position = 0
+    is_exhausted = False
+    is_started = False
+    is_item_expected = True
+    # After ",", so "]" is not allowed.
+    is_separated = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+
+        # Need more data.
+        if position == len(buffer):
+            if is_exhausted:
+                message = "Unexpected end of JSON array."
+                raise ValueError(message)
+
+            chunk = await anext(iterator, None)
+            is_exhausted = chunk is None
+            buffer = buffer[position:] + decoder.decode(chunk if chunk is not None else b"", final=is_exhausted)
+            position = 0
+            continue
+
+        character = buffer[position]
+
+        if not is_started:
+            if character != "[":
+                message = f"Expected '[' at the start of JSON array, got {character!r}."
+                raise ValueError(message)
+
+            is_started = True
+            position += 1
+            continue
+
+        if character == "]":
+            if is_separated:
+                message = "Unexpected ']' after ',' in JSON array."
+                raise ValueError(message)
+
+            return
+
+        if not is_item_expected:
+            if character != ",":
+                message = f"Expected ',' or ']' in JSON array, got {character!r}."
+                raise ValueError(message)
+
+            is_item_expected = True
+            is_separated = True
+            position += 1
+            continue
+
+        try:
+            item, end = _DECODER.raw_decode(buffer, position)
+
+        except json.JSONDecodeError:
+            if is_exhausted:
+                raise
+
+            end = None
+
+        # Item may be incomplete (e.g. number cut at the end of the buffer), read more and retry.
+        if end is None or (not is_exhausted and _is_incomplete(buffer, item, end)):
+            chunk = await anext(iterator, None)
+            is_exhausted = chunk is None
+            buffer += decoder.decode(chunk if chunk is not None else b"", final=is_exhausted)
+            continue
+
+        # Item is accepted only with a separator after it, e.g. "1x" is not read as 1.
+        following = _skip(buffer, end, _WHITESPACE)
+        if following < len(buffer) and buffer[following] not in ",]":
+            message = f"Expected ',' or ']' in JSON array, got {buffer[following]!r}."
+            raise ValueError(message)
+
+        yield item
+
+        position = end
+        is_item_expected = False
+        is_separated = False
+
+        if position > _COMPACT_THRESHOLD:
+            buffer = buffer[position:]
+            position = 0
+
+
+def _is_incomplete(buffer: str, item: Any, end: int) -> bool:
+    # Separator is not received yet, or decoder stopped before the rest of a number, e.g. "1." of
+    # "1.5" is decoded as 1.
+    return _skip(buffer, end, _WHITESPACE) == len(buffer) or (
+        type(item) in (int, float) and _skip(buffer, end, _NUMBER_CHARACTERS) == len(buffer)
+    )
+
+
+def _skip(buffer: str, position: int, characters: str | frozenset[str]) -> int:
+    while position < len(buffer) and buffer[position] in characters:
+        position += 1
+
+    return position
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+__all__ = ("RateLimiter",)
+
+
+class RateLimiter:
+    """Token bucket rate limiter.
+
+    Tokens are refilled with the constant rate, up to the capacity. Besides that, the limiter can be
+    blocked for some time, e.g. when the remote side asks to wait.
+
+    Examples:
+        >>> limiter = RateLimiter(1, capacity=5)
+        >>>
+        >>> async def request() -> None:
+        >>>     await limiter.acquire()
+        >>>     ...
+    """
+
+    def __init__(self, rate: float, *, capacity: int = 1) -> None:
+        """
+        Create a limiter.
+
+        Args:
+            rate: Tokens per second.
+            capacity: Maximum number of tokens, i.e. maximum burst.
+        """
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__tokens = float(capacity)
+        self.__updated = time.monotonic()
+        self.__blocked_until = 0.0
+        # Keeps waiters in order.
+        self.__lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+
+        Returns: None
+
+        """
+        async with self.__lock:
+            while True:
+                now = time.monotonic()
+
+                if now < self.__blocked_until:
+                    await asyncio.sleep(self.__blocked_until - now)
+                    continue
+
+                self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__rate)
+                self.__updated = now
+
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.__tokens) / self.__rate)
+
+    def block(self, seconds: float) -> None:
+        """
+        Do not give out tokens for the given time.
+
+        Args:
+            seconds: How long to wait.
+
+        Returns: None
+
+        """
+        self.__blocked_until = max(self.__blocked_until, time.monotonic() + seconds)
+        # One request right after the block, then the usual rate. The wait does not give tokens.
+        self.__tokens = 1
+        self.__updated = self.__blocked_until
@@ -0,0 +1,148 @@
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Generic, Hashable, TypeVar
+
+__all__ = ("TTLCache",)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """In-memory cache, where values expire after the given time.
+
+    When the cache is full, the least recently used value is dropped. Caches of different processes
+    (e.g. gunicorn workers) can share a file, then `invalidate` in any of them drops values in all.
+
+    Examples:
+        >>> cache: TTLCache[str, int] = TTLCache(60, max_size=100)
+        >>> cache.set("key", 1)
+        >>> cache.get("key")
+        1
+    """
+
+    def __init__(self, ttl: float, *, max_size: int = 1024, shared_path: Path | None = None) -> None:
+        """
+        Create a cache.
+
+        Args:
+            ttl: Seconds to keep a value.
+            max_size: Maximum number of values.
+            shared_path: File to share invalidations with other processes, e.g. on tmpfs.
+        """
+        self.__ttl = ttl
+        self.__max_size = max_size
+        # Key -> (expiration time, value).
+        self.__values: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        # Random token, that is changed on each invalidation, and number of local ones.
+        self.__shared_path = shared_path
+        self.__token = self.__read_token()
+        self.__clears = 0
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a value.
+
+        Args:
+            key: Key of the value.
+
+        Returns: The value, or None if there is no value or it is expired.
+
+        """
+        self.__refresh()
+        item = self.__values.get(key)
+
+        if item is None:
+            return None
+
+        expires_at, value = item
+
+        if expires_at <= time.monotonic():
+            del self.__values[key]
+            return None
+
+        self.__values.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, *, generation: bytes | None = None) -> None:  # noqa: A003
+        """
+        Put a value.
+
+        Args:
+            key: Key of the value.
+            value: The value.
+            generation: Generation, that was current before the value was read. The value is
+                dropped if the cache has been invalidated since then.
+
+        Returns: None
+
+        """
+        if generation is not None and generation != self.get_generation():
+            return
+
+        self.__values[key] = (time.monotonic() + self.__ttl, value)
+        self.__values.move_to_end(key)
+
+        while len(self.__values) > self.__max_size:
+            self.__values.popitem(last=False)
+
+    def get_generation(self) -> bytes:
+        """
+        Get a token, that changes on each invalidation.
+
+        Returns: The token.
+
+        """
+        self.__refresh()
+        return self.__token + self.__clears.to_bytes(8, "little")
+
+    def clear(self) -> None:
+        """
+        Drop all values of this process.
+
+        Returns: None
+
+        """
+        self.__values.clear()
+        self.__clears += 1
+
+    def invalidate(self) -> None:
+        """
+        Drop all values, also in other processes, that share the file.
+
+        Returns: None
+
+        """
+        self.__values.clear()
+        self.__token = os.urandom(16)
+
+        if self.__shared_path is None:
+            return
+
+        # Replace atomically, so readers never see a partially written token.
+        temporary_path = self.__shared_path.with_name(f"{self.__shared_path.name}.{os.getpid()}")
+        temporary_path.write_bytes(self.__token)
+        temporary_path.replace(self.__shared_path)
+
+    def __refresh(self) -> None:
+        if self.__shared_path is None:
+            return
+
+        token = self.__read_token()
+
+        # Invalidated by another process.
+        if token != self.__token:
+            self.__values.clear()
+            self.__token = token
+
+    def __read_token(self) -> bytes:
+        if self.__shared_path is None:
+            return b""
+
+        try:
+            return self.__shared_path.read_bytes()
+
+        except FileNotFoundError:
+            return b""
@@ -0,0 +1,76 @@
+import functools
+import hashlib
+from typing import Callable, Literal
+from uuid import UUID
+
+__all__ = ("UserHasher",)
+
+
+class UserHasher:
+    """Pseudonymizes user ids.
+
+    MD5 keeps ids, that were computed before, while keyed BLAKE2b can not be reversed by brute
+    force of all possible user ids without the key. Results are cached, since active users send
+    many messages.
+
+    Examples:
+        >>> hasher = UserHasher("blake2b", key=b"secret", cache_size=1024)
+        >>> hasher(42)
+        UUID('...')
+    """
+
+    def __init__(
+        self, algorithm: Literal["md5", "blake2b"] = "md5", *, key: bytes | None = None, cache_size: int = 65536
+    ) -> None:
+        """
+        Create a hasher.
+
+        Args:
+            algorithm: Hash function.
+            key: Secret key, required for BLAKE2b.
+            cache_size: Maximum number of cached ids.
+
+        Raises:
+            ValueError: If the key is missing, too long or not needed.
+        """
+        function: Callable[[int], UUID]
+
+        if algorithm == "blake2b":
+            if key is None:
+                message = "You should provide key for BLAKE2b."
+                raise ValueError(message)
+
+            if len(key) > hashlib.blake2b.MAX_KEY_SIZE:
+                message = f"BLAKE2b key should be at most {hashlib.blake2b.MAX_KEY_SIZE} bytes, got {len(key)}."
+                raise ValueError(message)
+
+            function = functools.partial(self.__hash_blake2b, key=key)
+
+        else:
+            if key is not None:
+                message = "MD5 does not support key."
+                raise ValueError(message)
+
+            function = self.__hash_md5
+
+        self.__hash = functools.lru_cache(maxsize=cache_size)(function)
+
+    def __call__(self, user: int) -> UUID:
+        """
+        Pseudonymize the user id.
+
+        Args:
+            user: Telegram id of the user.
+
+        Returns: Stable pseudonymous id.
+
+        """
+        return self.__hash(user)
+
+    @staticmethod
+    def __hash_md5(user: int) -> UUID:
+        return UUID(bytes=hashlib.md5(str(user).encode()).digest())  # noqa: S324
+
+    @staticmethod
+    def __hash_blake2b(user: int, *, key: bytes) -> UUID:
+        return UUID(bytes=hashlib.blake2b(str(user).encode(), key=key, digest_size=16).digest())
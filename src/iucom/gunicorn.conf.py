@@ -4,8 +4,9 @@ bind = "0.0.0.0"
 
 worker_class = "uvicorn.workers.UvicornWorker"
 
-# Use each core.
-workers = os.cpu_count()
+# Use each core, unless set explicitly. Each worker opens its own MongoDB pool, so connections to the
+# database are up to workers * IUCOM_DATABASE_MAX_POOL_SIZE, plus monitoring ones.
+workers = int(os.environ.get("IUCOM_API_WORKERS", 0)) or os.cpu_count()
 if workers is None:
     workers = 1
 
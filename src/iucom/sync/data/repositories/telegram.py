@@ -1,6 +1,11 @@
+import asyncio
 from contextlib import suppress
-from typing import Awaitable, Callable
+from datetime import timezone
+from logging import getLogger
+from typing import Any, Awaitable, Callable, TypeVar
 
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
 from telethon import events
 from telethon.errors import ChannelPrivateError, ChatNotModifiedError, FloodWaitError
 from telethon.tl.functions.channels import (
@@ -21,12 +26,14 @@ from telethon.tl.types import (
     ChatReactionsSome,
     DialogFilter,
     DialogFilterDefault,
+    InputPeerChannel,
     PeerChannel,
     PeerUser,
     ReactionEmoji,
 )
 
 from iucom.common.data.storages.mongodb import MongoDBStorage
+from iucom.common.utils import RateLimiter
 from iucom.sync.data.storages.telegram import TelegramStorage
 from iucom.sync.domains.telegram.entities import (
     TelegramCreateEntity,
@@ -38,6 +45,8 @@ from iucom.sync.domains.telegram.enums import SlowMode
 
 __all__ = ("TelegramRepository",)
 
+Return = TypeVar("Return")
+
 
 class TelegramRepository:
     NECESSARY_REACTIONS = ChatReactionsSome(list(map(ReactionEmoji, ("🔥", "😢", "👎", "👍", "❤", "🐳"))))
@@ -51,16 +60,40 @@ class TelegramRepository:
         electives_folder_title: str = "Electives",
         other_folder_title: str = "Other",
         collection: str = "orphans",
+        folders_collection: str = "folders",
+        peers_collection: str = "peers",
+        requests_per_second: float = 1.0,
+        requests_burst: int = 5,
+        max_flood_wait: int = 300,
+        resolve_concurrency: int = 8,
     ) -> None:
         self.__telegram_storage = telegram_storage
         self.__mongodb_storage = mongodb_storage
         self.__collection = mongodb_storage.client[collection]
+        # Last applied membership of folders, to skip not changed ones.
+        self.__folders_collection = mongodb_storage.client[folders_collection]
+        # Channel id -> access hash, so peers are resolved without requests to Telegram.
+        self.__peers_collection = mongodb_storage.client[peers_collection]
+        self.__peers: dict[int, InputPeerChannel] | None = None
+        self.__peers_lock = asyncio.Lock()
 
         # Folders.
         self.__core_folder_title = core_folder_title
         self.__electives_folder_title = electives_folder_title
         self.__other_folder_title = other_folder_title
 
+        # Telegram applies flood limits per method, so each request type has its own limiter.
+        self.__requests_per_second = requests_per_second
+        self.__requests_burst = requests_burst
+        self.__max_flood_wait = max_flood_wait
+        self.__limiters: dict[str, RateLimiter] = {}
+        self.__resolve_concurrency = resolve_concurrency
+
+        self.__logger = getLogger(f"iucom.{self.__class__.__name__}")
+
+        # Released in `shutdown`.
+        mongodb_storage.acquire()
+
     def add_on_message_handler(self, handler: Callable[[TelegramMessageEntity], Awaitable[None]]) -> None:
         @self.__telegram_storage.client.on(events.NewMessage(incoming=True))
         async def _wrapper(event: events.NewMessage.Event) -> None:
@@ -73,19 +106,20 @@ class TelegramRepository:
                     chat=event.message.peer_id.channel_id,
                     user=event.message.from_id.user_id,
                     body=event.message.message,
-                    created_at=event.message.date,
+                    created_at=event.message.date.astimezone(tz=timezone.utc),
                 )
             )
 
     async def get(self, id_: int) -> TelegramEntity | None:
         try:
-            result = await self.__telegram_storage.client(
-                GetFullChannelRequest(await self.__telegram_storage.client.get_input_entity(id_))
-            )
+            result = await self.__request(GetFullChannelRequest(await self.__get_input_peer(id_)))
 
         except (ChannelPrivateError, ValueError):
+            await self.__forget_peer(id_)
             return None
 
+        await self.__remember_peer(result.chats[0].id, result.chats[0].access_hash)
+
         slow_mode = result.full_chat.slowmode_seconds
         if slow_mode is None:
             slow_mode = SlowMode.DISABLED
@@ -102,7 +136,7 @@ class TelegramRepository:
 
     async def create(self, entity: TelegramCreateEntity) -> TelegramEntity:
         # Create in Telegram.
-        result = await self.__telegram_storage.client(
+        result = await self.__request(
             CreateChannelRequest(
                 title=entity.title,
                 about=entity.description,
@@ -112,22 +146,27 @@ class TelegramRepository:
         )
 
         try:
+            peer = await self.__remember_peer(result.chats[0].id, result.chats[0].access_hash)
+
             if not entity.is_broadcast:
                 # Permissions.
-                await self.__telegram_storage.client.edit_permissions(
-                    result.chats[0].id,
-                    view_messages=True,
-                    send_messages=True,
-                    send_media=True,
-                    send_stickers=False,
-                    send_gifs=False,
-                    send_games=False,
-                    send_inline=False,
-                    embed_link_previews=True,
-                    send_polls=True,
-                    change_info=False,
-                    invite_users=True,
-                    pin_messages=False,
+                await self.__limited(
+                    "edit_permissions",
+                    lambda: self.__telegram_storage.client.edit_permissions(
+                        peer,
+                        view_messages=True,
+                        send_messages=True,
+                        send_media=True,
+                        send_stickers=False,
+                        send_gifs=False,
+                        send_games=False,
+                        send_inline=False,
+                        embed_link_previews=True,
+                        send_polls=True,
+                        change_info=False,
+                        invite_users=True,
+                        pin_messages=False,
+                    ),
                 )
 
         except Exception as exception:
@@ -145,35 +184,35 @@ class TelegramRepository:
         )
 
     async def update(self, entity: TelegramUpdateEntity) -> None:
-        peer = await self.__telegram_storage.client.get_input_entity(entity.id)
+        peer = await self.__get_input_peer(entity.id)
 
         with suppress(ChatNotModifiedError):
             if entity.all_reactions is not None:
                 reactions = ChatReactionsAll() if entity.all_reactions else self.NECESSARY_REACTIONS
-                await self.__telegram_storage.client(SetChatAvailableReactionsRequest(peer, reactions))
+                await self.__request(SetChatAvailableReactionsRequest(peer, reactions))
 
             if entity.title is not None:
-                await self.__telegram_storage.client(EditTitleRequest(peer, entity.title))
+                await self.__request(EditTitleRequest(peer, entity.title))
 
             if entity.description is not None:
-                await self.__telegram_storage.client(EditChatAboutRequest(peer, entity.description))
+                await self.__request(EditChatAboutRequest(peer, entity.description))
 
             if entity.slow_mode is not None:
-                await self.__telegram_storage.client(ToggleSlowModeRequest(peer, entity.slow_mode.value))
+                await self.__request(ToggleSlowModeRequest(peer, entity.slow_mode.value))
 
     async def delete(self, id_: int, *, robust: bool = True) -> None:
         try:
-            await self.__telegram_storage.client(
-                DeleteChannelRequest(await self.__telegram_storage.client.get_input_entity(id_))
-            )
+            await self.__request(DeleteChannelRequest(await self.__get_input_peer(id_)))
 
             # Delete from orphans, if present.
             await self.__collection.delete_many({"id": id_})
+            await self.__forget_peer(id_)
 
         # Channel already deleted.
         except (ChannelPrivateError, ValueError):
             # Delete from orphans, if present.
             await self.__collection.delete_many({"id": id_})
+            await self.__forget_peer(id_)
 
         except FloodWaitError as exception:
             if not robust:
@@ -199,12 +238,101 @@ class TelegramRepository:
         await self.__telegram_storage.shutdown()
         await self.__mongodb_storage.shutdown()
 
+    async def __request(self, request: Any) -> Any:
+        return await self.__limited(type(request).__name__, lambda: self.__telegram_storage.client(request))
+
+    async def __limited(self, resource: str, function: Callable[[], Awaitable[Return]]) -> Return:
+        limiter = self.__limiters.get(resource)
+
+        if limiter is None:
+            limiter = self.__limiters[resource] = RateLimiter(
+                self.__requests_per_second, capacity=self.__requests_burst
+            )
+
+        while True:
+            await limiter.acquire()
+
+            try:
+                return await function()
+
+            except FloodWaitError as exception:
+                # Nobody should use this resource, until the flood wait is over.
+                limiter.block(exception.seconds)
+
+                if exception.seconds > self.__max_flood_wait:
+                    raise exception
+
+                self.__logger.warning(f"Flood wait for {resource}: {exception.seconds}s.")
+
+    async def __get_input_peer(self, id_: int) -> Any:
+        peer = (await self.__load_peers()).get(id_)
+
+        if peer is not None:
+            return peer
+
+        # Unknown channel, resolve it once.
+        peer = await self.__limited("get_input_entity", lambda: self.__telegram_storage.client.get_input_entity(id_))
+
+        if isinstance(peer, InputPeerChannel):
+            await self.__remember_peer(peer.channel_id, peer.access_hash)
+
+        return peer
+
+    async def __remember_peer(self, id_: int, access_hash: int) -> InputPeerChannel:
+        peers = await self.__load_peers()
+        peer = peers.get(id_)
+
+        if peer is None or peer.access_hash != access_hash:
+            peer = peers[id_] = InputPeerChannel(id_, access_hash)
+            await self.__peers_collection.update_one(
+                {"id": id_}, {"$set": {"id": id_, "access_hash": access_hash}}, upsert=True
+            )
+
+        return peer
+
+    async def __forget_peer(self, id_: int) -> None:
+        (await self.__load_peers()).pop(id_, None)
+        await self.__peers_collection.delete_many({"id": id_})
+
+    async def __load_peers(self) -> dict[int, InputPeerChannel]:
+        if self.__peers is not None:
+            return self.__peers
+
+        # Load once, even if there are concurrent callers.
+        async with self.__peers_lock:
+            if self.__peers is None:
+                # Created here, since the constructor is synchronous. Concurrent upserts of the same
+                # peer must not insert it twice.
+                try:
+                    await self.__peers_collection.create_indexes(
+                        [IndexModel((("id", ASCENDING),), name="peers_id_idx", unique=True)]
+                    )
+
+                # Duplicates from older versions have the same access hash, so they are harmless.
+                except DuplicateKeyError as exception:
+                    self.__logger.warning(f"Cannot create unique index of peers, remove duplicates: {exception}.")
+
+                self.__peers = {
+                    document["id"]: InputPeerChannel(document["id"], document["access_hash"])
+                    async for document in self.__peers_collection.find({}, projection={"_id": False})
+                }
+
+        return self.__peers
+
     async def __update_folder(self, folder_title: str, entity_ids: list[int]) -> None:
+        entity_ids = sorted(set(entity_ids))
+
+        # Nothing changed since the last update. Delete the document to force the update.
+        applied = await self.__folders_collection.find_one({"title": folder_title})
+        if applied is not None and applied["ids"] == entity_ids:
+            self.__logger.info(f"Folder '{folder_title}' is not changed.")
+            return
+
         ids = {1, 2}
         folder_id = None
 
         # Find existing folder.
-        for folder in await self.__telegram_storage.client(GetDialogFiltersRequest()):
+        for folder in await self.__request(GetDialogFiltersRequest()):
             # Skip default.
             if isinstance(folder, DialogFilterDefault):
                 continue
@@ -231,19 +359,25 @@ class TelegramRepository:
         # Clearing.
         # TODO: Deleting folder throws INPUT_METHOD_INVALID_472471681_289215.
         if len(entity_ids) == 0:
-            me = await self.__telegram_storage.client.get_me(input_peer=True)
-            entity_ids = [me.user_id]
+            peers = [await self.__limited("get_me", lambda: self.__telegram_storage.client.get_me(input_peer=True))]
+
+        else:
+            semaphore = asyncio.Semaphore(self.__resolve_concurrency)
+
+            async def _resolve(id_: int) -> Any:
+                async with semaphore:
+                    return await self.__get_input_peer(id_)
+
+            peers = await asyncio.gather(*(_resolve(id_) for id_ in entity_ids))
 
         # Update / Create folder.
-        await self.__telegram_storage.client(
+        await self.__request(
             UpdateDialogFilterRequest(
                 folder_id,
-                DialogFilter(
-                    folder_id,
-                    folder_title,
-                    pinned_peers=[],
-                    include_peers=[await self.__telegram_storage.client.get_input_entity(id_) for id_ in entity_ids],
-                    exclude_peers=[],
-                ),
+                DialogFilter(folder_id, folder_title, pinned_peers=[], include_peers=peers, exclude_peers=[]),
             )
         )
+
+        await self.__folders_collection.update_one(
+            {"title": folder_title}, {"$set": {"title": folder_title, "ids": entity_ids}}, upsert=True
+        )
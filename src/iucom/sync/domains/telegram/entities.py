@@ -1,6 +1,7 @@
-from datetime import datetime, timezone
+import dataclasses
+from datetime import datetime
 
-from pydantic import AnyUrl, Field, validator
+from pydantic import AnyUrl, Field
 from pydantic.dataclasses import dataclass
 
 from iucom.sync.domains.telegram.enums import SlowMode
@@ -35,14 +36,12 @@ class TelegramEntity:
     slow_mode: SlowMode = Field()
 
 
-@dataclass
+# Created for every incoming message, so there is no validation. Values come from Telethon as is,
+# except created_at, which is converted to UTC.
+@dataclasses.dataclass(slots=True)
 class TelegramMessageEntity:
-    id: int = Field()  # noqa: A003
-    chat: int = Field()
-    user: int = Field()
-    body: str = Field()
-    created_at: datetime = Field()
-
-    @validator("created_at", always=True)
-    def __validate_updated_at(cls, value: datetime) -> datetime:
-        return value.astimezone(tz=timezone.utc)
+    id: int  # noqa: A003
+    chat: int
+    user: int
+    body: str
+    created_at: datetime
@@ -1,17 +1,17 @@
 import asyncio
-import hashlib
 from logging import getLogger
+from typing import AsyncContextManager, Collection
 from uuid import UUID, uuid4
 
 from iucom.common.domains.chats.entities import ChatEntity
 from iucom.common.domains.chats.enums import ChatStatus, ChatType
-from iucom.common.domains.chats.errors import ChatsNotFoundError
+from iucom.common.domains.chats.errors import ChatsNotSupportedError
 from iucom.common.domains.chats.interactors import ChatsInteractor
 from iucom.common.domains.cources.enums import CourseType
-from iucom.common.domains.cources.errors import CoursesNotFoundError
 from iucom.common.domains.cources.interactors import CoursesInteractor
 from iucom.common.domains.statistics.entities import MessageEntity
 from iucom.common.domains.statistics.interactors import StatisticsInteractor
+from iucom.common.utils import UserHasher
 from iucom.sync.data.repositories.telegram import TelegramRepository
 from iucom.sync.domains.telegram.entities import (
     TelegramCreateEntity,
@@ -31,48 +31,72 @@ class TelegramInteractor:
         chats_interactor: ChatsInteractor,
         courses_interactor: CoursesInteractor,
         statistics_interactor: StatisticsInteractor,
+        *,
+        concurrency: int = 1,
+        user_hasher: UserHasher | None = None,
     ) -> None:
         self.__telegram_repository = telegram_repository
         self.__chats_interactor = chats_interactor
         self.__courses_interactor = courses_interactor
         self.__statistics_interactor = statistics_interactor
+        self.__concurrency = concurrency
+        self.__user_hasher = user_hasher if user_hasher is not None else UserHasher()
+        # Telegram entity -> chat id, to handle messages without database reads.
+        self.__chat_ids: dict[int, UUID] = {}
+        # Chat id -> telegram entity, to forget the old entity, when a chat is recreated.
+        self.__telegram_entities: dict[UUID, int] = {}
+        # Chats changed since the last sync. None means all not synced chats.
+        self.__changed_ids: set[UUID] | None = set()
+        self.__changed = asyncio.Event()
+        self.__is_syncing_changes = False
+        # Event driven and periodic syncs should not process the same chats at once.
+        self.__sync_lock = asyncio.Lock()
         self.__logger = getLogger(f"iucom.{self.__class__.__name__}")
 
     def setup_on_message_callback(self) -> None:
         self.__telegram_repository.add_on_message_handler(self.__on_message)
 
-    async def sync(self, *, exclude_synced: bool = False) -> None:  # noqa: PLR0912, PLR0915
-        self.__logger.info(f"Syncing... Exclude synced objects: {exclude_synced}.")
-
-        is_new_chats_added = False
-        async for transaction in self.__chats_interactor.update_by_filter(exclude_synced=exclude_synced):
-            telegram_entity = None
+    async def load_chats(self) -> None:
+        self.__telegram_entities = {
+            entity.id: entity.telegram_entity
+            async for entity in self.__chats_interactor.filter()
+            # Same as `__remember_chat`.
+            if entity.telegram_entity is not None and entity.status != ChatStatus.DELETING
+        }
+        self.__chat_ids = {telegram_entity: id_ for id_, telegram_entity in self.__telegram_entities.items()}
+
+    @property
+    def is_syncing_changes(self) -> bool:
+        # If so, periodic sync of not synced chats is not needed.
+        return self.__is_syncing_changes
+
+    async def watch_chats(
+        self, *, reload_period: int = 300, sync_changes: bool = False, sync_delay: float = 1.0
+    ) -> None:
+        tasks = [self.__watch_chats(reload_period, sync_changes=sync_changes), self.__reload_chats(reload_period)]
 
-            try:
-                async with transaction as chat_entity:
-                    self.__logger.info(f"Syncing: {chat_entity}.")
-                    telegram_entity = await self.__sync(chat_entity)
-                    self.__logger.info(f"Synced: {chat_entity}.")
+        if sync_changes:
+            tasks.append(self.__sync_changes(sync_delay))
 
-                # If __sync function returns an entity, then the chat was created/recreated.
-                is_new_chats_added = is_new_chats_added or telegram_entity is not None
+        await asyncio.gather(*tasks)
 
-            except Exception as exception:
-                self.__logger.exception(f"Exception: {exception}.")
+    async def sync(self, *, exclude_synced: bool = False, ids: Collection[UUID] | None = None) -> None:
+        async with self.__sync_lock:
+            await self.__sync_chats(exclude_synced=exclude_synced, ids=ids)
 
-                # No need to delete any orphans.
-                if telegram_entity is None:
-                    continue
+    async def __sync_chats(self, *, exclude_synced: bool, ids: Collection[UUID] | None) -> None:  # noqa: PLR0912
+        self.__logger.info(
+            f"Syncing... Exclude synced objects: {exclude_synced}. Chats: {len(ids) if ids is not None else 'all'}."
+        )
 
-                try:
-                    # This means, that chat was created, but bound chat entity was modified.
-                    # So delete orphan chat.
-                    self.__logger.exception(f"Deleting orphan: {telegram_entity}.")
-                    await self.__telegram_repository.delete(telegram_entity.id)
-                    self.__logger.exception("Deleted.")
+        # Each chat is synced in its own transaction, up to `concurrency` chats at once.
+        semaphore = asyncio.Semaphore(self.__concurrency)
+        tasks = []
+        async for transaction in self.__chats_interactor.update_by_filter(exclude_synced=exclude_synced, ids=ids):
+            tasks.append(asyncio.create_task(self.__sync_transaction(transaction, semaphore)))
 
-                except Exception as exception:
-                    self.__logger.exception(f"Exception: {exception}.")
+        # If any chat was created/recreated.
+        is_new_chats_added = any(await asyncio.gather(*tasks))
 
         try:
             self.__logger.info("Deleting orphans...")
@@ -88,6 +112,9 @@ class TelegramInteractor:
             self.__logger.info("Synced.")
             return
 
+        # There are much fewer courses than chats, so load all of them at once.
+        course_types = {course.id: course.type async for course in self.__courses_interactor.filter()}
+
         core_ids = []
         electives_ids = []
         other_ids = []
@@ -95,15 +122,8 @@ class TelegramInteractor:
             if entity.telegram_entity is None:
                 continue
 
-            try:
-                course = await self.__courses_interactor.get(entity.course)
-
-            # Course was deleted.
-            except CoursesNotFoundError:
-                other_ids.append(entity.telegram_entity)
-                continue
-
-            match course.type:
+            # Course may be deleted, then the chat goes to the other folder.
+            match course_types.get(entity.course):
                 case CourseType.CORE:
                     core_ids.append(entity.telegram_entity)
 
@@ -146,8 +166,11 @@ class TelegramInteractor:
         self.__logger.info("Synced.")
 
     async def shutdown(self) -> None:
+        # Flush buffered statistics first. The storage is closed by the last one anyway.
+        await self.__statistics_interactor.shutdown()
         await self.__telegram_repository.shutdown()
         await self.__chats_interactor.shutdown()
+        await self.__courses_interactor.shutdown()
 
     @staticmethod
     def __get_title(entity: ChatEntity) -> str:
@@ -161,6 +184,43 @@ class TelegramInteractor:
             case _:
                 return entity.title
 
+    async def __sync_transaction(
+        self, transaction: AsyncContextManager[ChatEntity], semaphore: asyncio.Semaphore
+    ) -> bool:
+        # Acquired by the task itself, so a failed or cancelled task cannot keep the slot.
+        async with semaphore:
+            telegram_entity = None
+
+            try:
+                async with transaction as chat_entity:
+                    self.__logger.info(f"Syncing: {chat_entity}.")
+                    telegram_entity = await self.__sync(chat_entity)
+                    self.__logger.info(f"Synced: {chat_entity}.")
+
+                self.__remember_chat(chat_entity)
+
+                # If __sync function returns an entity, then the chat was created/recreated.
+                return telegram_entity is not None
+
+            except Exception as exception:
+                self.__logger.exception(f"Exception: {exception}.")
+
+                # No need to delete any orphans.
+                if telegram_entity is None:
+                    return False
+
+                try:
+                    # This means, that chat was created, but bound chat entity was modified.
+                    # So delete orphan chat.
+                    self.__logger.exception(f"Deleting orphan: {telegram_entity}.")
+                    await self.__telegram_repository.delete(telegram_entity.id)
+                    self.__logger.exception("Deleted.")
+
+                except Exception as exception:
+                    self.__logger.exception(f"Exception: {exception}.")
+
+                return False
+
     async def __sync(self, chat_entity: ChatEntity) -> TelegramEntity | None:
         # Do not need to check anything.
         if chat_entity.status == ChatStatus.DELETING:
@@ -198,9 +258,6 @@ class TelegramInteractor:
             self.__logger.info(f"Created: {telegram_entity}")
             return telegram_entity
 
-        # Avoid flood.
-        await asyncio.sleep(5)
-
         # Prepare update.
         update = TelegramUpdateEntity(id=telegram_entity.id)
 
@@ -254,11 +311,97 @@ class TelegramInteractor:
 
         return telegram_entity
 
+    def __remember_chat(self, entity: ChatEntity) -> None:
+        # Recreated chat has a new entity, messages of the old one are not ours anymore.
+        self.__forget_chat(entity.id)
+
+        if entity.telegram_entity is None or entity.status == ChatStatus.DELETING:
+            return
+
+        self.__chat_ids[entity.telegram_entity] = entity.id
+        self.__telegram_entities[entity.id] = entity.telegram_entity
+
+    def __forget_chat(self, id_: UUID) -> None:
+        telegram_entity = self.__telegram_entities.pop(id_, None)
+
+        if telegram_entity is not None and self.__chat_ids.get(telegram_entity) == id_:
+            del self.__chat_ids[telegram_entity]
+
+    async def __watch_chats(self, reload_period: int, *, sync_changes: bool) -> None:
+        while True:
+            if sync_changes:
+                # Changes may be missed, while the stream was not watched.
+                self.__schedule_sync(None)
+                self.__is_syncing_changes = True
+
+            try:
+                async for id_, entity in self.__chats_interactor.watch():
+                    if entity is None:
+                        # Chat was deleted, we do not know which one, see `ChatsRepository.watch`.
+                        if id_ is None:
+                            await self.load_chats()
+
+                        else:
+                            self.__forget_chat(id_)
+
+                        continue
+
+                    self.__remember_chat(entity)
+
+                    if sync_changes and entity.status != ChatStatus.SYNCED:
+                        self.__schedule_sync(entity.id)
+
+            # Standalone server, retrying will not help.
+            except ChatsNotSupportedError as exception:
+                self.__logger.warning(f"{exception} Relying on periodic reload and sync.")
+                self.__is_syncing_changes = False
+                return
+
+            except Exception as exception:
+                self.__logger.exception(f"Cannot watch chats, relying on periodic reload and sync: {exception}.")
+
+            self.__is_syncing_changes = False
+            await asyncio.sleep(reload_period)
+
+    def __schedule_sync(self, id_: UUID | None) -> None:
+        if id_ is None:
+            self.__changed_ids = None
+
+        elif self.__changed_ids is not None:
+            self.__changed_ids.add(id_)
+
+        self.__changed.set()
+
+    async def __sync_changes(self, delay: float) -> None:
+        while True:
+            await self.__changed.wait()
+            # Let changes, that come together (e.g. import), to be synced at once.
+            await asyncio.sleep(delay)
+
+            self.__changed.clear()
+            ids, self.__changed_ids = self.__changed_ids, set()
+
+            try:
+                await self.sync(exclude_synced=True, ids=ids)
+
+            except Exception as exception:
+                self.__logger.exception(f"Exception: {exception}.")
+
+    async def __reload_chats(self, reload_period: int) -> None:
+        while True:
+            await asyncio.sleep(reload_period)
+
+            try:
+                await self.load_chats()
+
+            except Exception as exception:
+                self.__logger.exception(f"Exception: {exception}.")
+
     async def __on_message(self, message: TelegramMessageEntity) -> None:
-        try:
-            chat = await self.__chats_interactor.get(telegram_entity=message.chat)
+        chat_id = self.__chat_ids.get(message.chat)
 
-        except ChatsNotFoundError:
+        # Not our chat.
+        if chat_id is None:
             return
 
         await self.__statistics_interactor.create(
@@ -266,9 +409,9 @@ class TelegramInteractor:
                 # If we need to be able to link real message and the message in db,
                 # then we need to use hash. But for now, use just random ids.
                 id=uuid4(),
-                chat=chat.id,
+                chat=chat_id,
                 # To be able to determine most active users, etc., we need to robust id.
-                user=UUID(bytes=hashlib.md5(str(message.user).encode()).digest()),  # noqa: S324
+                user=self.__user_hasher(message.user),
                 body=message.body,
                 created_at=message.created_at,
             )
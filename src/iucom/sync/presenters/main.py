@@ -1,5 +1,6 @@
 import asyncio
 import logging.config
+from argparse import ArgumentParser
 from datetime import datetime, timezone
 
 from iucom.common.data.repositories.chats import ChatsRepository
@@ -10,7 +11,7 @@ from iucom.common.domains.chats.interactors import ChatsInteractor
 from iucom.common.domains.cources.interactors import CoursesInteractor
 from iucom.common.domains.statistics.interactors import StatisticsInteractor
 from iucom.common.settings import Settings
-from iucom.common.utils import entrypoint
+from iucom.common.utils import UserHasher, entrypoint
 from iucom.sync.data.repositories.telegram import TelegramRepository
 from iucom.sync.data.storages.telegram import TelegramStorage
 from iucom.sync.domains.telegram.interactors import TelegramInteractor
@@ -33,23 +34,75 @@ logging.config.dictConfig(
 )
 
 
+def _create_mongodb_storage(settings: Settings) -> MongoDBStorage:
+    return MongoDBStorage(
+        settings.DATABASE_URL,
+        db=settings.DATABASE_NAME,
+        max_pool_size=settings.DATABASE_MAX_POOL_SIZE,
+        min_pool_size=settings.DATABASE_MIN_POOL_SIZE,
+        max_idle_time=settings.DATABASE_MAX_IDLE_TIME,
+        connect_timeout=settings.DATABASE_CONNECT_TIMEOUT,
+        server_selection_timeout=settings.DATABASE_SERVER_SELECTION_TIMEOUT,
+        socket_timeout=settings.DATABASE_SOCKET_TIMEOUT,
+        compressors=settings.DATABASE_COMPRESSORS,
+        # Sync writes what it reads, so all its reads go to the primary.
+        drain_timeout=settings.DATABASE_DRAIN_TIMEOUT,
+    )
+
+
 @entrypoint
 async def telegram() -> None:
     settings = Settings()
 
-    mongodb_storage = await MongoDBStorage(settings.DATABASE_URL, db=settings.DATABASE_NAME)
+    mongodb_storage = await _create_mongodb_storage(settings)
 
     interactor = TelegramInteractor(
         TelegramRepository(
-            await TelegramStorage(settings.TELEGRAM_SESSION, settings.TELEGRAM_API_ID, settings.TELEGRAM_API_HASH),
+            await TelegramStorage(
+                settings.TELEGRAM_SESSION,
+                settings.TELEGRAM_API_ID,
+                settings.TELEGRAM_API_HASH,
+                # Flood waits are raised to the rate limiters, so other tasks wait too.
+                flood_sleep_threshold=0,
+            ),
             mongodb_storage,
             core_folder_title=settings.TELEGRAM_CORE_FOLDER,
             electives_folder_title=settings.TELEGRAM_ELECTIVES_FOLDER,
             other_folder_title=settings.TELEGRAM_OTHER_FOLDER,
+            requests_per_second=settings.TELEGRAM_REQUESTS_PER_SECOND,
+            requests_burst=settings.TELEGRAM_REQUESTS_BURST,
+            max_flood_wait=settings.TELEGRAM_MAX_FLOOD_WAIT,
+            resolve_concurrency=settings.TELEGRAM_RESOLVE_CONCURRENCY,
+        ),
+        ChatsInteractor(await ChatsRepository(mongodb_storage, trusted_reads=settings.DATABASE_TRUSTED_READS)),
+        CoursesInteractor(
+            await CoursesMongoDBRepository(mongodb_storage, trusted_reads=settings.DATABASE_TRUSTED_READS)
+        ),
+        StatisticsInteractor(
+            await StatisticsRepository(
+                mongodb_storage,
+                collection=settings.STATISTICS_COLLECTION,
+                batch_size=settings.STATISTICS_BATCH_SIZE,
+                flush_period=settings.STATISTICS_FLUSH_PERIOD,
+                queue_size=settings.STATISTICS_QUEUE_SIZE,
+                time_series=settings.STATISTICS_TIME_SERIES,
+                retention=settings.STATISTICS_RETENTION,
+            )
+        ),
+        concurrency=settings.TELEGRAM_SYNC_CONCURRENCY,
+        user_hasher=UserHasher(
+            settings.STATISTICS_USER_HASH,
+            key=settings.STATISTICS_USER_HASH_KEY.encode() if settings.STATISTICS_USER_HASH_KEY is not None else None,
+            cache_size=settings.STATISTICS_USER_HASH_CACHE_SIZE,
         ),
-        ChatsInteractor(await ChatsRepository(mongodb_storage)),
-        CoursesInteractor(await CoursesMongoDBRepository(mongodb_storage)),
-        StatisticsInteractor(await StatisticsRepository(mongodb_storage)),
+    )
+
+    # Chats must be known before the first message arrives.
+    await interactor.load_chats()
+    watcher = asyncio.create_task(
+        interactor.watch_chats(
+            reload_period=settings.TELEGRAM_CHATS_RELOAD_PERIOD, sync_changes=settings.TELEGRAM_SYNC_ON_CHANGES
+        )
     )
 
     # Setup callback on messages.
@@ -63,7 +116,10 @@ async def telegram() -> None:
             now = datetime.now(tz=timezone.utc)
 
             if (now - last_sync).total_seconds() > settings.TELEGRAM_SYNC_PERIOD:
-                await interactor.sync(exclude_synced=True)
+                # Changed chats are already synced by the watcher, poll only if it does not work.
+                if not interactor.is_syncing_changes:
+                    await interactor.sync(exclude_synced=True)
+
                 last_sync = datetime.now(tz=timezone.utc)
 
             if (now - last_full_sync).total_seconds() > settings.TELEGRAM_FULL_SYNC_PERIOD:
@@ -73,7 +129,9 @@ async def telegram() -> None:
             await asyncio.sleep(1)
 
     finally:
+        watcher.cancel()
         await interactor.shutdown()
+        await mongodb_storage.shutdown()
 
 
 @entrypoint
@@ -84,9 +142,11 @@ async def moodle() -> None:
         message = "You should specify IU_SSO_CLIENT_ID and IU_SSO_CLIENT_SECRET."
         raise ValueError(message)
 
+    mongodb_storage = await _create_mongodb_storage(settings)
+
     interactor = CoursesInteractor(
-        await CoursesMongoDBRepository(await MongoDBStorage(settings.DATABASE_URL, db=settings.DATABASE_NAME)),
-        CoursesMoodleRepository(settings.IU_SSO_CLIENT_ID, settings.IU_SSO_CLIENT_SECRET),
+        await CoursesMongoDBRepository(mongodb_storage, trusted_reads=settings.DATABASE_TRUSTED_READS),
+        await CoursesMoodleRepository(settings.IU_SSO_CLIENT_ID, settings.IU_SSO_CLIENT_SECRET),
     )
 
     try:
@@ -103,3 +163,33 @@ async def moodle() -> None:
 
     finally:
         await interactor.shutdown()
+        await mongodb_storage.shutdown()
+
+
+@entrypoint
+async def statistics_migrate() -> None:
+    parser = ArgumentParser(
+        prog="Statistics migration.",
+        description=(
+            "Converts existing statistics to the layout from the settings and rebuilds rollups. Stop the sync first."
+        ),
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    settings = Settings()
+    logger = logging.getLogger("iucom.statistics_migrate")
+
+    mongodb_storage = await _create_mongodb_storage(settings)
+
+    try:
+        count = await StatisticsRepository.migrate(
+            mongodb_storage,
+            collection=settings.STATISTICS_COLLECTION,
+            time_series=settings.STATISTICS_TIME_SERIES,
+            batch_size=args.batch_size,
+        )
+        logger.info(f"Migrated {count} entries.")
+
+    finally:
+        await mongodb_storage.shutdown()
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from typing import Any
+
+from iucom.common.domains.chats.entities import ChatEntity
+from iucom.common.domains.chats.enums import ChatStatus, ChatType
+from iucom.common.domains.statistics.interactors import StatisticsInteractor
+from iucom.sync.domains.telegram.entities import TelegramMessageEntity
+from iucom.sync.domains.telegram.interactors import TelegramInteractor
+
+CHATS = 100
+USERS = 1000
+
+
+class DummyStatisticsRepository:
+    """Keeps entries in memory, like the write queue of the real repository."""
+
+    def __init__(self) -> None:
+        self.entries: list[Any] = []
+
+    async def insert(self, entity: Any) -> None:
+        self.entries.append(entity)
+
+
+async def run(messages: int, repeat: int) -> None:
+    repository = DummyStatisticsRepository()
+    interactor = TelegramInteractor(
+        telegram_repository=None,  # type: ignore[arg-type]
+        chats_interactor=None,  # type: ignore[arg-type]
+        courses_interactor=None,  # type: ignore[arg-type]
+        statistics_interactor=StatisticsInteractor(repository),  # type: ignore[arg-type]
+    )
+
+    for i in range(CHATS):
+        interactor._TelegramInteractor__remember_chat(  # type: ignore[attr-defined]
+            ChatEntity(
+                title=f"Chat {i}",
+                course=f"COURSE-{i}",
+                type=ChatType.STUDENTS,
+                status=ChatStatus.SYNCED,
+                telegram_entity=i,
+            )
+        )
+
+    on_message = interactor._TelegramInteractor__on_message  # type: ignore[attr-defined]
+    created_at = datetime.now(tz=timezone.utc)
+
+    async def handle() -> None:
+        for i in range(messages):
+            await on_message(
+                TelegramMessageEntity(id=i, chat=i % CHATS, user=i % USERS, body="Hello, world!", created_at=created_at)
+            )
+
+    timings = []
+    for _ in range(repeat):
+        repository.entries.clear()
+        started = time.perf_counter()
+        await handle()
+        timings.append(time.perf_counter() - started)
+
+    repository.entries.clear()
+
+    # Entries are kept by the repository, so the difference is the memory of queued entries.
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    await handle()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    difference = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in difference)
+    size = sum(stat.size_diff for stat in difference)
+
+    print(f"Messages: {messages}, best of {repeat}.")
+    print(f"{'Time':<30} {min(timings) / messages * 1e6:>10.2f} us/message")
+    print(f"{'Retained memory':<30} {size / messages:>10.2f} bytes/message")
+    print(f"{'Retained blocks':<30} {blocks / messages:>10.2f} blocks/message")
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        prog="Message path benchmark.",
+        description="Measures time and allocations per incoming message, from the Telethon handler to statistics.",
+    )
+
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+
+    asyncio.run(run(args.messages, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
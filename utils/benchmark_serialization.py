@@ -0,0 +1,148 @@
+import timeit
+from argparse import ArgumentParser
+from typing import Any, Callable
+
+import orjson
+
+from iucom.api.endpoints.chats.schemas import Chat
+from iucom.api.endpoints.courses.schemas import Course
+from iucom.common.data.repositories.chats import ChatsRepository
+from iucom.common.data.repositories.cources import CoursesMongoDBRepository
+from iucom.common.domains.chats.entities import ChatEntity
+from iucom.common.domains.chats.enums import ChatType
+from iucom.common.domains.cources.enums import CourseDegree, CourseType
+
+# Private helpers of the repositories, the same code that is used on reads and writes.
+serialize_chat = ChatsRepository._ChatsRepository__serialize  # type: ignore[attr-defined]
+deserialize_chat = ChatsRepository._ChatsRepository__deserialize  # type: ignore[attr-defined]
+deserialize_course = CoursesMongoDBRepository._CoursesMongoDBRepository__deserialize  # type: ignore[attr-defined]
+
+
+def measure(title: str, function: Callable[[], Any], rows: int, repeat: int) -> float:
+    per_row = min(timeit.repeat(function, number=1, repeat=repeat)) / rows * 1e6
+    print(f"{title:<50} {per_row:>8.2f} us/row")
+    return per_row
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        prog="Serialization benchmark.",
+        description="Measures per row cost of reading and serializing chats and courses.",
+    )
+
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+
+    chat_documents = [
+        {
+            "_id": i,
+            **serialize_chat(
+                ChatEntity(
+                    title=f"Chat {i}",
+                    course=f"COURSE-{i}",
+                    type=ChatType.STUDENTS,
+                    telegram_entity=i,
+                    telegram_invite_link=f"https://t.me/+invite{i}",
+                )
+            ),
+        }
+        for i in range(args.rows)
+    ]
+    course_documents = [
+        {
+            "_id": i,
+            "id": f"COURSE-{i}",
+            "moodle": i,
+            "full_name": f"Course {i}",
+            "short_name": f"C{i}",
+            "year": 2023,
+            "type": CourseType.CORE.value,
+            "degree": CourseDegree.BACHELORS.value,
+        }
+        for i in range(args.rows)
+    ]
+
+    chats = [deserialize_chat(document, trusted=False) for document in chat_documents]
+    courses = [deserialize_course(document, trusted=False) for document in course_documents]
+
+    print(f"Rows: {args.rows}, best of {args.repeat}.")
+
+    before = measure(
+        "Chats: validated read + pydantic response",
+        lambda: orjson.dumps(
+            [Chat.from_entity(deserialize_chat(document, trusted=False)).dict() for document in chat_documents]
+        ),
+        args.rows,
+        args.repeat,
+    )
+    after = measure(
+        "Chats: trusted read + direct encoder",
+        lambda: orjson.dumps(
+            [Chat.serialize_entity(deserialize_chat(document, trusted=True)) for document in chat_documents]
+        ),
+        args.rows,
+        args.repeat,
+    )
+    print(f"{'Chats: speedup':<50} {before / after:>8.2f} x")
+
+    measure(
+        "Chats: validated read",
+        lambda: [deserialize_chat(document, trusted=False) for document in chat_documents],
+        args.rows,
+        args.repeat,
+    )
+    measure(
+        "Chats: trusted read",
+        lambda: [deserialize_chat(document, trusted=True) for document in chat_documents],
+        args.rows,
+        args.repeat,
+    )
+    measure(
+        "Chats: pydantic response",
+        lambda: orjson.dumps([Chat.from_entity(chat).dict() for chat in chats]),
+        args.rows,
+        args.repeat,
+    )
+    measure(
+        "Chats: direct encoder",
+        lambda: orjson.dumps([Chat.serialize_entity(chat) for chat in chats]),
+        args.rows,
+        args.repeat,
+    )
+
+    before = measure(
+        "Courses: validated read + pydantic response",
+        lambda: orjson.dumps(
+            [Course.from_entity(deserialize_course(document, trusted=False)).dict() for document in course_documents]
+        ),
+        args.rows,
+        args.repeat,
+    )
+    after = measure(
+        "Courses: trusted read + direct encoder",
+        lambda: orjson.dumps(
+            [Course.serialize_entity(deserialize_course(document, trusted=True)) for document in course_documents]
+        ),
+        args.rows,
+        args.repeat,
+    )
+    print(f"{'Courses: speedup':<50} {before / after:>8.2f} x")
+
+    measure(
+        "Courses: pydantic response",
+        lambda: orjson.dumps([Course.from_entity(course).dict() for course in courses]),
+        args.rows,
+        args.repeat,
+    )
+    measure(
+        "Courses: direct encoder",
+        lambda: orjson.dumps([Course.serialize_entity(course) for course in courses]),
+        args.rows,
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
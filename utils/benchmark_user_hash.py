@@ -0,0 +1,42 @@
+import random
+import timeit
+from argparse import ArgumentParser
+
+from iucom.common.utils import UserHasher
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        prog="User hash benchmark.",
+        description="Measures per message cost of user pseudonymization, with and without cache.",
+    )
+
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+
+    # Few users send most of messages.
+    random.seed(0)
+    users = [
+        1_000_000_000 + int(user)
+        for user in random.choices(range(args.users), weights=[1 / (i + 1) for i in range(args.users)], k=args.messages)
+    ]
+
+    print(f"Messages: {args.messages}, users: {args.users}, best of {args.repeat}.")
+
+    for algorithm, key in (("md5", None), ("blake2b", b"secret")):
+        for cache_size in (0, args.users):
+            hasher = UserHasher(algorithm, key=key, cache_size=cache_size)  # type: ignore[arg-type]
+
+            per_message = (
+                min(timeit.repeat(lambda: [hasher(user) for user in users], number=1, repeat=args.repeat))  # noqa: B023
+                / args.messages
+                * 1e9
+            )
+            print(f"{algorithm + (' cached' if cache_size > 0 else ''):<20} {per_message:>8.1f} ns/message")
+
+
+if __name__ == "__main__":
+    main()